@@ -0,0 +1,361 @@
+"""
+Gameplay analytics with fixed memory.
+
+Analytics keeps only aggregates, never a per-event log; every session
+feeds it through its own sink (Analytics.session()):
+
+- counters (events, command verbs, deaths by cause and by room, rooms
+  reached, combat actions, damage by source), each capped at a fixed
+  number of keys; anything past the cap is counted under "(other)";
+- quantile sketches (log-bucketed histograms with 1% relative error) for
+  turns and seconds to win, turns survived and rounds per fight;
+- HyperLogLog estimates of how many distinct commands and distinct unknown
+  commands players type.
+
+Every `flush_interval` seconds, and when a game ends, the aggregates
+collected since the last flush are merged into a local JSON file (read,
+merge, atomic replace, all under an exclusive lock on <file>.lock) and
+reset, so several game processes can share one file and memory stays flat
+however long a process runs.
+
+    python main.py --analytics analytics.json
+    python analytics.py analytics.json [rooms.json]     # summary report
+
+This module must not import main (main imports it).
+"""
+
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+import events
+
+try:
+    import fcntl
+except ImportError:     # Windows: no flock, concurrent flushes from several processes may race
+    fcntl = None
+
+OTHER = "(other)"
+
+
+class BoundedCounter:
+    """
+    Counts per key, keeping at most `limit` keys.
+    """
+    def __init__(self, limit=256, counts=None):
+        self.limit = limit
+        self.counts = {}
+        if counts:
+            self.update(counts)
+
+    def add(self, key, amount=1):
+        counts = self.counts
+        if key not in counts and len(counts) >= self.limit:
+            key = OTHER
+        counts[key] = counts.get(key, 0) + amount
+
+    def update(self, counts):
+        for key, amount in counts.items():
+            self.add(key, amount)
+
+    def to_dict(self):
+        return dict(self.counts)
+
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram: every value lands in a bucket whose bounds are
+    within `accuracy` of each other, so any quantile is answered with that
+    relative error. Memory grows with the log of the value range, not with
+    the number of values; past `max_buckets` the lowest buckets are merged.
+    """
+    def __init__(self, accuracy=0.01, max_buckets=2048):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets = {}       # bucket index -> count
+        self.zeros = 0          # values <= 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value, count=1):
+        self.count += count
+        self.total += value * count
+        if value <= 0:
+            self.zeros += count
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            low = sorted(self.buckets)[:2]
+            self.buckets[low[1]] += self.buckets.pop(low[0])
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.zeros += other.zeros
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        while len(self.buckets) > self.max_buckets:
+            low = sorted(self.buckets)[:2]
+            self.buckets[low[1]] += self.buckets.pop(low[0])
+
+    def to_dict(self):
+        return {"accuracy": self.accuracy, "count": self.count, "total": self.total,
+                "zeros": self.zeros, "buckets": {str(k): v for k, v in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["accuracy"])
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        sketch.zeros = data["zeros"]
+        sketch.buckets = {int(k): v for k, v in data["buckets"].items()}
+        return sketch
+
+
+class HyperLogLog:
+    """
+    Approximate distinct count in 2**precision bytes (about 3% error at the
+    default precision). Uses a stable hash so files from different
+    processes can be merged.
+    """
+    def __init__(self, precision=10):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        h = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)     # linear counting for small sets
+        return raw
+
+    def merge(self, other):
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def to_dict(self):
+        return {"precision": self.precision, "registers": self.registers.hex()}
+
+    @classmethod
+    def from_dict(cls, data):
+        hll = cls(data["precision"])
+        hll.registers = bytearray.fromhex(data["registers"])
+        return hll
+
+
+# ----------------------------
+#   Aggregates
+# ----------------------------
+
+COUNTERS = ("events", "verbs", "deaths_by_cause", "deaths_by_room", "rooms_reached",
+            "combat_actions", "damage_by_source")
+SKETCHES = ("win_turns", "win_seconds", "session_turns", "fight_rounds")
+DISTINCT = ("commands", "unknown_commands")
+
+
+class Analytics:
+    """
+    The aggregates of one process. Each game session subscribes its own
+    sink, session(), to its bus; sessions only meet here, under a lock.
+    """
+    def __init__(self, path="analytics.json", flush_interval=60.0, clock=time.monotonic):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.last_flush = clock()
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.counters = {name: BoundedCounter() for name in COUNTERS}
+        self.sketches = {name: QuantileSketch() for name in SKETCHES}
+        self.distinct = {name: HyperLogLog() for name in DISTINCT}
+
+    # ----------------------------
+    #   Persistence
+    # ----------------------------
+
+    def to_dict(self):
+        return {
+            "counters": {name: c.to_dict() for name, c in self.counters.items()},
+            "sketches": {name: s.to_dict() for name, s in self.sketches.items()},
+            "distinct": {name: h.to_dict() for name, h in self.distinct.items()},
+        }
+
+    def merge_dict(self, data):
+        for name, counts in data.get("counters", {}).items():
+            if name in self.counters:
+                self.counters[name].update(counts)
+        for name, sketch in data.get("sketches", {}).items():
+            if name in self.sketches:
+                self.sketches[name].merge(QuantileSketch.from_dict(sketch))
+        for name, hll in data.get("distinct", {}).items():
+            if name in self.distinct:
+                self.distinct[name].merge(HyperLogLog.from_dict(hll))
+
+    def flush(self):
+        """
+        Merge what was collected since the last flush into the file.
+        """
+        self.last_flush = self.clock()
+        # Another process flushing between our read and replace would lose its data
+        with open(f"{self.path}.lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(self.path, "r") as f:
+                    self.merge_dict(json.load(f))
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp, self.path)
+        self._reset()
+
+    def session(self):
+        """
+        A new event sink for one session.
+        """
+        return SessionStats(self)
+
+
+# ----------------------------
+#   Session Sink
+# ----------------------------
+
+class SessionStats:
+    """
+    Event sink for one session: tracks the game in progress (turns, room,
+    current fight) and records into the shared Analytics.
+    """
+    def __init__(self, stats):
+        self.stats = stats
+        self.started = stats.clock()
+        self.turns = 0
+        self.location = None
+        self.rounds = 0
+
+    def __call__(self, event):
+        stats = self.stats
+        name = type(event).__name__
+        with stats.lock:
+            stats.counters["events"].add(name)
+            handler = getattr(self, "on_" + name, None)
+            if handler is not None:
+                handler(event)
+            if isinstance(event, events.GameEnded):
+                stats.flush()
+            elif stats.clock() - stats.last_flush >= stats.flush_interval:
+                stats.flush()
+
+    def on_GameStarted(self, event):
+        self.started = self.stats.clock()
+        self.turns = 0
+
+    def on_CommandIssued(self, event):
+        self.turns += 1
+        verb = event.command.split(" ", 1)[0] if event.command else ""
+        self.stats.counters["verbs"].add(verb)
+        self.stats.distinct["commands"].add(event.command)
+
+    def on_UnknownCommand(self, event):
+        self.stats.distinct["unknown_commands"].add(event.command)
+
+    def on_RoomEntered(self, event):
+        self.location = event.room.name
+        if event.first_visit:
+            self.stats.counters["rooms_reached"].add(event.room.name)
+
+    def on_DamageTaken(self, event):
+        self.stats.counters["damage_by_source"].add(event.source, event.amount)
+
+    def on_EnemyAppeared(self, event):
+        self.rounds = 0
+
+    def on_CombatRound(self, event):
+        self.rounds += 1
+        self.stats.counters["combat_actions"].add(event.action)
+        if event.escaped:
+            self.stats.sketches["fight_rounds"].add(self.rounds)
+
+    def on_EnemyDefeated(self, event):
+        self.stats.sketches["fight_rounds"].add(self.rounds)
+
+    def on_PlayerDied(self, event):
+        self.stats.counters["deaths_by_cause"].add(event.cause)
+        self.stats.counters["deaths_by_room"].add(self.location or "?")
+        self.stats.sketches["session_turns"].add(self.turns)
+
+    def on_GameWon(self, event):
+        self.stats.sketches["win_turns"].add(self.turns)
+        self.stats.sketches["win_seconds"].add(self.stats.clock() - self.started)
+        self.stats.sketches["session_turns"].add(self.turns)
+
+    def on_GameQuit(self, event):
+        self.stats.sketches["session_turns"].add(self.turns)
+
+
+def load(path):
+    stats = Analytics(path)
+    with open(path, "r") as f:
+        stats.merge_dict(json.load(f))
+    return stats
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "analytics.json"
+    stats = load(path)
+    ev = stats.counters["events"].counts
+    print(f"📊  {ev.get('GameStarted', 0)} games: {ev.get('GameWon', 0)} won, "
+          f"{ev.get('PlayerDied', 0)} died, {ev.get('GameQuit', 0)} quit")
+    for label, name in (("Turns to win", "win_turns"), ("Seconds to win", "win_seconds"),
+                        ("Turns per game", "session_turns"), ("Rounds per fight", "fight_rounds")):
+        s = stats.sketches[name]
+        if s.count:
+            print(f"   {label}: p50 {s.quantile(0.5):.1f}, p90 {s.quantile(0.9):.1f}, "
+                  f"p99 {s.quantile(0.99):.1f} ({s.count} samples)")
+    for label, name in (("Deaths by cause", "deaths_by_cause"), ("Deaths by room", "deaths_by_room"),
+                        ("Combat actions", "combat_actions"), ("Command verbs", "verbs")):
+        counts = stats.counters[name].counts
+        if counts:
+            top = sorted(counts.items(), key=lambda kv: -kv[1])[:10]
+            print(f"   {label}: " + ", ".join(f"{k} {v}" for k, v in top))
+    print(f"   Distinct commands typed: ~{stats.distinct['commands'].estimate():.0f} "
+          f"(unknown: ~{stats.distinct['unknown_commands'].estimate():.0f})")
+
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], "r") as f:
+            room_names = json.load(f)
+        reached = stats.counters["rooms_reached"].counts
+        never = [name for name in room_names if name not in reached]
+        print("   Never reached: " + (", ".join(never) if never else "none"))
@@ -0,0 +1,143 @@
+"""
+Contention benchmark for the shared world.
+
+Runs the same random mix of pickups, moves and fights from many threads,
+through the game's own handlers, against SharedWorld (one lock per room) and
+GlobalLockWorld (one lock for everything), and prints actions per second
+for each. --hold adds
+simulated work inside every locked section (e.g. persisting the room), which
+is where a world-wide lock starts serialising everyone.
+
+    python bench_contention.py --rooms 500 --threads 1,4,16,64 --hold 0.0005
+"""
+
+import argparse
+import random
+import threading
+import time
+
+import events
+import main
+from world import GlobalLockWorld, SharedWorld
+
+
+def generate_rooms(count, items_per_room, seed=0):
+    """
+    A ring of rooms with a few random shortcuts, each holding unique items.
+    """
+    rng = random.Random(seed)
+    names = [f"Room {i}" for i in range(count)]
+    rooms = {}
+    for i, name in enumerate(names):
+        connections = [names[(i - 1) % count], names[(i + 1) % count]]
+        connections += rng.sample(names, min(2, count))
+        rooms[name] = main.Room(name, {
+            "description": f"Generated room {i}.",
+            "items": [f"item {i}-{j}" for j in range(items_per_room)],
+            "connections": list(dict.fromkeys(c for c in connections if c != name)),
+        })
+    return rooms
+
+
+class SlowLock:
+    """
+    Wraps a lock and spends `hold` seconds inside it, releasing the GIL like real I/O would.
+    """
+    def __init__(self, lock, hold):
+        self.lock = lock
+        self.hold = hold
+
+    def __enter__(self):
+        self.lock.acquire()
+        time.sleep(self.hold)
+        return self
+
+    def __exit__(self, *exc):
+        self.lock.release()
+
+
+def with_hold(world_cls, hold):
+    if not hold:
+        return world_cls
+
+    class Held(world_cls):
+        def lock_for(self, room_name):
+            return SlowLock(super().lock_for(room_name), hold)
+
+    return Held
+
+
+def run(world_cls, rooms, threads, duration, seed=0):
+    world = world_cls(rooms, {})
+    names = list(rooms)
+    players = [main.Player(start_location=names[i * len(names) // threads], hp=10 ** 9)
+               for i in range(threads)]
+    counts = [0] * threads
+    stop = threading.Event()
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        player = players[index]
+        bus = events.EventBus()     # nothing subscribed: only the rules and locks are timed
+        ask = lambda prompt: rng.choice(("attack", "defend", "run"))
+        done = 0
+        while not stop.is_set():
+            roll = rng.random()
+            room = rooms[player.location]
+            if roll < 0.4 and room.items:
+                main.handle_pickup(bus, player, rooms, rng.choice(room.items), world)
+            elif roll < 0.8:
+                main.handle_move(bus, player, rooms, rng.choice(room.connections).lower(), world)
+            else:
+                main.handle_combat(bus, player, ask, rng, world)
+            done += 1
+        counts[index] = done
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return sum(counts) / elapsed, players
+
+
+def check_conservation(rooms, players, total_items):
+    """
+    Every item must be either still in a room or in exactly one inventory.
+    """
+    in_rooms = [item for room in rooms.values() for item in room.items]
+    carried = [item for player in players for item in player.inventory]
+    everything = in_rooms + carried
+    return len(everything) == total_items and len(set(everything)) == total_items
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--items", type=int, default=20, help="items per room")
+    parser.add_argument("--threads", default="1,4,16,64")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per run")
+    parser.add_argument("--hold", type=float, default=0.0005,
+                        help="simulated seconds of work inside each locked section")
+    args = parser.parse_args()
+    main.set_headless(True)     # no pauses between combat rounds
+
+    print(f"{args.rooms} rooms, {args.items} items each, hold={args.hold * 1000:.2f} ms")
+    print(f"{'threads':>8} {'per-room locks':>16} {'global lock':>14} {'speed-up':>9}")
+    for threads in (int(t) for t in args.threads.split(",")):
+        results = []
+        for world_cls in (SharedWorld, GlobalLockWorld):
+            rooms = generate_rooms(args.rooms, args.items)
+            rate, players = run(with_hold(world_cls, args.hold), rooms, threads, args.duration)
+            if not check_conservation(rooms, players, args.rooms * args.items):
+                raise SystemExit(f"Item conservation violated with {world_cls.__name__}!")
+            results.append(rate)
+        print(f"{threads:>8} {results[0]:>13.0f}/s {results[1]:>11.0f}/s {results[0] / results[1]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main_benchmark()
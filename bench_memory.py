@@ -0,0 +1,111 @@
+"""
+Per-session memory of the room state.
+
+Builds N sessions over a generated world three times: with the Room class
+from before templates existed (OriginalRoom below, the baseline), with
+every session owning private templates (as Room(name, dict) does) and with
+all sessions sharing main.RoomTemplate objects, then plays a few moves in
+each session so copy-on-write overlays get created. Memory is measured with
+tracemalloc and reported per session.
+
+    python bench_memory.py --rooms 1000 --sessions 200
+"""
+
+import argparse
+import random
+import tracemalloc
+
+import main
+
+
+class OriginalRoom:
+    """
+    The game's original Room class: every session copies the room's text,
+    items and connections. Only what the benchmark touches.
+    """
+    def __init__(self, name, data):
+        self.name = name
+        self.description = data["description"]
+        self.items = data.get("items", []).copy()
+        self.connections = data.get("connections", []).copy()
+        self.hints = data.get("hints", "")
+        self.visited = False
+
+    def remove_item(self, item_name):
+        if item_name in self.items:
+            self.items.remove(item_name)
+
+    def add_connection(self, new_room_name):
+        if new_room_name not in self.connections:
+            self.connections.append(new_room_name)
+
+
+def generate_rooms_data(count, items_per_room, seed=0):
+    rng = random.Random(seed)
+    names = [f"Room {i}" for i in range(count)]
+    data = {}
+    for i, name in enumerate(names):
+        data[name] = {
+            "description": f"Room {i}. " + " ".join(rng.choice(("dark", "damp", "ancient", "quiet", "cold"))
+                                                    for _ in range(40)),
+            "items": [f"item {i}-{j}" for j in range(items_per_room)],
+            "connections": [names[(i + 1) % count], names[(i - 1) % count]],
+            "hints": f"Hint for room {i}.",
+        }
+    return data
+
+
+def play(rooms, moves, rng):
+    """
+    Touch a few rooms the way a player would: visit, pick up, open a passage.
+    """
+    names = list(rooms)
+    for _ in range(moves):
+        room = rooms[rng.choice(names)]
+        room.visited = True
+        if room.items:
+            room.remove_item(room.items[0])
+        if rng.random() < 0.1:
+            room.add_connection(rng.choice(names))
+
+
+def measure(build, sessions, moves):
+    rng = random.Random(1)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = [build() for _ in range(sessions)]
+    fresh = tracemalloc.get_traced_memory()[0]
+    for rooms in built:
+        play(rooms, moves, rng)
+    played = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (fresh - before) / sessions, (played - before) / sessions
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=3, help="items per room")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--moves", type=int, default=50, help="rooms touched per session")
+    args = parser.parse_args()
+
+    data = generate_rooms_data(args.rooms, args.items)
+    templates = {name: main.RoomTemplate(name, info) for name, info in data.items()}
+
+    original = measure(lambda: {name: OriginalRoom(name, info) for name, info in data.items()},
+                       args.sessions, args.moves)
+    private = measure(lambda: {name: main.Room(name, info) for name, info in data.items()},
+                      args.sessions, args.moves)
+    shared = measure(lambda: {name: main.Room(name, t) for name, t in templates.items()},
+                     args.sessions, args.moves)
+
+    print(f"{args.rooms} rooms, {args.sessions} sessions, {args.moves} rooms touched per session")
+    print(f"{'':>18} {'new session':>12} {'after play':>12}")
+    print(f"{'original Room':>18} {original[0] / 1024:>9.1f} KB {original[1] / 1024:>9.1f} KB")
+    print(f"{'private rooms':>18} {private[0] / 1024:>9.1f} KB {private[1] / 1024:>9.1f} KB")
+    print(f"{'shared templates':>18} {shared[0] / 1024:>9.1f} KB {shared[1] / 1024:>9.1f} KB")
+
+
+if __name__ == "__main__":
+    main_benchmark()
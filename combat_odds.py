@@ -0,0 +1,234 @@
+"""
+Exact combat odds.
+
+Computes, without simulation, how a fight against an enemy ends under the
+rules of main.handle_combat: the probabilities of winning, fleeing, dying
+or never finishing (e.g. defending forever against an enemy that can't hurt
+you), and the player's expected HP when it is over (0 if they died).
+
+A CombatModel holds one set of rules (player attack and defense, enemy
+attack, run chance) and fills its table bottom-up: every action only ever
+lowers one of the two HP values, so states are solved in increasing
+(player HP, enemy HP) order. An action that might leave the state unchanged
+(a failed run or a harmless hit) is solved in closed form. Tables are
+cached per rule set and grow on demand, so evaluating a whole grid of
+loadouts reuses the work.
+
+Policies: "attack", "defend", "run" (always the same action) or "optimal",
+which picks the action that maximises the chance of surviving, then of
+winning, then the expected HP left.
+
+    python combat_odds.py     # win chances for a grid of loadouts vs the Goblin
+"""
+
+import main
+
+ACTIONS = ("attack", "defend", "run")
+POLICIES = ACTIONS + ("optimal",)
+
+
+class Outcome:
+    __slots__ = ("win", "flee", "death", "stalemate", "expected_hp", "action")
+
+    def __init__(self, win=0.0, flee=0.0, death=0.0, stalemate=0.0, expected_hp=0.0, action=None):
+        self.win = win
+        self.flee = flee
+        self.death = death
+        self.stalemate = stalemate
+        self.expected_hp = expected_hp
+        self.action = action     # first action the policy takes (None once the fight is over)
+
+    def __repr__(self):
+        return (f"Outcome(win={self.win:.3f}, flee={self.flee:.3f}, death={self.death:.3f}, "
+                f"stalemate={self.stalemate:.3f}, expected_hp={self.expected_hp:.2f}, action={self.action!r})")
+
+    def score(self):
+        # What "optimal" maximises, rounded so float noise doesn't decide ties
+        return (round(1 - self.death - self.stalemate, 12), round(self.win, 12), round(self.expected_hp, 12))
+
+
+DEATH = Outcome(death=1.0)
+
+def _won(hp):
+    return Outcome(win=1.0, expected_hp=hp)
+
+def _fled(hp):
+    return Outcome(flee=1.0, expected_hp=hp)
+
+STALEMATE = Outcome(stalemate=1.0)
+
+
+def _mix(branches, action):
+    """
+    Weighted sum of outcomes: branches is [(probability, Outcome), ...].
+    """
+    result = Outcome(action=action)
+    for p, o in branches:
+        result.win += p * o.win
+        result.flee += p * o.flee
+        result.death += p * o.death
+        result.stalemate += p * o.stalemate
+        result.expected_hp += p * o.expected_hp
+    return result
+
+
+class CombatModel:
+    def __init__(self, attack, defense, enemy_attack=main.GOBLIN_ATTACK, run_chance=main.RUN_CHANCE):
+        self.attack = attack
+        self.defense = defense
+        self.run_chance = run_chance
+        self.hit = main.enemy_damage(enemy_attack, False, defense)            # normal hit
+        self.guarded_hit = main.enemy_damage(enemy_attack, True, defense)     # hit while defending
+        self.tables = {policy: {} for policy in POLICIES}
+        self.size = {policy: (0, 0) for policy in POLICIES}
+
+    def _value(self, table, player_hp, enemy_hp):
+        if player_hp <= 0:
+            return DEATH
+        if enemy_hp <= 0:
+            return _won(player_hp)
+        return table[player_hp, enemy_hp]
+
+    def _hit(self, table, player_hp, enemy_hp, damage):
+        """
+        Outcome after the enemy hits for `damage`, or None if that leaves the state unchanged.
+        """
+        if damage == 0:
+            return None
+        return self._value(table, player_hp - damage, enemy_hp)
+
+    def _action_outcome(self, table, action, h, e, same=None):
+        """
+        Outcome of taking `action` in state (h, e). If the action can leave
+        the state unchanged, `same` is the outcome of carrying on from there;
+        None means the same action is taken again (a policy that always
+        defends stalls, one that always runs eventually gets away).
+        """
+        if action == "attack":
+            if e - self.attack <= 0:
+                return _mix([(1.0, _won(h))], action)
+            if self.attack == 0 and self.hit == 0:
+                return Outcome(stalemate=1.0, action=action) if same is None else _mix([(1.0, same)], action)
+            after = self._value(table, h - self.hit, e - self.attack)
+            return _mix([(1.0, after)], action)
+
+        if action == "defend":
+            after = self._hit(table, h, e, self.guarded_hit)
+            if after is None:
+                after = STALEMATE if same is None else same
+            return _mix([(1.0, after)], action)
+
+        # run: flee, or take a normal hit; a harmless failed run leaves the state as it was
+        after = self._hit(table, h, e, self.hit)
+        if after is None:
+            if same is not None:
+                after = same
+            elif self.run_chance > 0:
+                return _mix([(1.0, _fled(h))], action)
+            else:
+                return Outcome(stalemate=1.0, action=action)
+        return _mix([(self.run_chance, _fled(h)), (1 - self.run_chance, after)], action)
+
+    def _fill(self, policy, max_player_hp, max_enemy_hp):
+        done_h, done_e = self.size[policy]
+        if max_player_hp <= done_h and max_enemy_hp <= done_e:
+            return
+        table = self.tables[policy]
+        max_h = max(max_player_hp, done_h)
+        max_e = max(max_enemy_hp, done_e)
+        for h in range(1, max_h + 1):
+            for e in range(1, max_e + 1):
+                if (h, e) in table:
+                    continue
+                if policy == "optimal":
+                    best = None
+                    for action in ACTIONS:
+                        o = self._action_outcome(table, action, h, e)
+                        if best is None or o.score() > best.score():
+                            best = o
+                    table[h, e] = best
+                else:
+                    table[h, e] = self._action_outcome(table, policy, h, e)
+        self.size[policy] = (max_h, max_e)
+
+    def action_outcomes(self, player_hp, enemy_hp):
+        """
+        {action: Outcome} for taking each action now and playing optimally
+        afterwards, including when the action changes nothing (e.g. defending
+        against a hit that armor fully blocks).
+        """
+        table = self.tables["optimal"]
+        self._fill("optimal", player_hp, enemy_hp)
+        best = self._value(table, player_hp, enemy_hp)
+        return {action: self._action_outcome(table, action, player_hp, enemy_hp, best) for action in ACTIONS}
+
+    def outcome(self, player_hp, enemy_hp, policy="optimal"):
+        if player_hp <= 0:
+            return DEATH
+        if enemy_hp <= 0:
+            return _won(player_hp)
+        self._fill(policy, player_hp, enemy_hp)
+        return self.tables[policy][player_hp, enemy_hp]
+
+
+# ----------------------------
+#   Cached Entry Points
+# ----------------------------
+
+_models = {}
+
+def model_for(attack, defense, enemy_attack=main.GOBLIN_ATTACK, run_chance=main.RUN_CHANCE):
+    key = (attack, defense, enemy_attack, run_chance)
+    model = _models.get(key)
+    if model is None:
+        model = _models[key] = CombatModel(attack, defense, enemy_attack, run_chance)
+    return model
+
+def combat_outcome(player_hp, enemy_hp, attack, defense, policy="optimal",
+                   enemy_attack=main.GOBLIN_ATTACK, run_chance=main.RUN_CHANCE):
+    return model_for(attack, defense, enemy_attack, run_chance).outcome(player_hp, enemy_hp, policy)
+
+def recommended_action(player_hp, enemy_hp, attack, defense,
+                       enemy_attack=main.GOBLIN_ATTACK, run_chance=main.RUN_CHANCE):
+    return combat_outcome(player_hp, enemy_hp, attack, defense, "optimal", enemy_attack, run_chance).action
+
+def action_outcomes(player_hp, enemy_hp, attack, defense,
+                    enemy_attack=main.GOBLIN_ATTACK, run_chance=main.RUN_CHANCE):
+    return model_for(attack, defense, enemy_attack, run_chance).action_outcomes(player_hp, enemy_hp)
+
+def outcome_grid(player_hps, enemy_hps, attacks, defenses, policy="optimal",
+                 enemy_attack=main.GOBLIN_ATTACK, run_chance=main.RUN_CHANCE):
+    """
+    Evaluate every combination at once. Returns {(player_hp, enemy_hp, attack, defense): Outcome}.
+    Each (attack, defense) table is filled once, up to the largest HP values asked for.
+    """
+    player_hps = list(player_hps)
+    enemy_hps = list(enemy_hps)
+    results = {}
+    for attack in attacks:
+        for defense in defenses:
+            model = model_for(attack, defense, enemy_attack, run_chance)
+            model._fill(policy, max(player_hps), max(enemy_hps))
+            for player_hp in player_hps:
+                for enemy_hp in enemy_hps:
+                    results[player_hp, enemy_hp, attack, defense] = model.outcome(player_hp, enemy_hp, policy)
+    return results
+
+def player_odds(player, enemy_hp, items_data, policy="optimal"):
+    """
+    Odds for a Player against a Goblin with `enemy_hp` left, using their current gear.
+    """
+    return combat_outcome(player.hp, enemy_hp, player.attack_power(items_data),
+                          player.defense_bonus(items_data), policy)
+
+
+if __name__ == "__main__":
+    hps = range(1, 11)
+    attacks = range(1, 5)
+    defenses = range(0, 2)
+    grid = outcome_grid(hps, [main.GOBLIN_HP], attacks, defenses)
+    print(f"⚔️  Win chance vs Goblin (HP {main.GOBLIN_HP}, attack {main.GOBLIN_ATTACK}) with the best play")
+    print("HP  " + "".join(f"  atk{a}/def{d}" for a in attacks for d in defenses))
+    for hp in hps:
+        row = "".join(f"{grid[hp, main.GOBLIN_HP, a, d].win * 100:>10.1f}%" for a in attacks for d in defenses)
+        print(f"{hp:>2}  {row}")
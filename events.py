@@ -0,0 +1,265 @@
+"""
+Typed events emitted by the game engine.
+
+The engine never prints. It builds one of the event objects below and hands
+it to the session's EventBus, which passes it to every subscribed sink (any
+callable taking an event). Front ends (console, Tk) subscribe a renderer;
+headless runs subscribe nothing, so no text is ever formatted.
+"""
+
+# ----------------------------
+#   Event Bus
+# ----------------------------
+
+class EventBus:
+    """
+    The sinks of one game session. Every session (console game, GUI window,
+    load-test player) has its own bus, so a sink only ever sees the events
+    of the session it was subscribed to.
+    """
+    def __init__(self, sinks=()):
+        self.sinks = []
+        for sink in sinks:
+            self.subscribe(sink)
+
+    def subscribe(self, sink):
+        if sink not in self.sinks:
+            self.sinks.append(sink)
+
+    def unsubscribe(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    def clear(self):
+        self.sinks.clear()
+
+    def emit(self, event):
+        for sink in self.sinks:
+            sink(event)
+
+
+# ----------------------------
+#   Event Types
+# ----------------------------
+
+class Event:
+    """
+    Base class for everything the engine reports.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class GameEnded(Event):
+    """
+    Base class for events after which the session is over.
+    """
+    __slots__ = ()
+
+
+# --- Session ---
+
+class GameStarted(Event):
+    __slots__ = ()
+
+class GameQuit(GameEnded):
+    __slots__ = ()
+
+class GameWon(GameEnded):
+    __slots__ = ("room",)
+    def __init__(self, room):
+        self.room = room
+
+class PlayerDied(GameEnded):
+    __slots__ = ("cause",)
+    def __init__(self, cause):
+        self.cause = cause       # "cold" or the enemy's name
+
+class GameSaved(Event):
+    __slots__ = ("slot",)
+    def __init__(self, slot):
+        self.slot = slot
+
+class GameLoaded(Event):
+    __slots__ = ("slot",)
+    def __init__(self, slot):
+        self.slot = slot
+
+class SaveMissing(Event):
+    __slots__ = ("slot",)
+    def __init__(self, slot):
+        self.slot = slot
+
+class InvalidSaveName(Event):
+    """
+    A slot name the player typed that saves can't use (see saves.valid_name).
+    """
+    __slots__ = ("slot",)
+    def __init__(self, slot):
+        self.slot = slot
+
+class Undone(Event):
+    __slots__ = ()
+
+class NothingToUndo(Event):
+    __slots__ = ()
+
+class SavesListed(Event):
+    __slots__ = ("saves",)
+    def __init__(self, saves):
+        self.saves = saves       # [(slot, saved_at timestamp), ...] newest first
+
+
+# --- Exploration ---
+
+class RoomEntered(Event):
+    __slots__ = ("room", "first_visit", "hp")
+    def __init__(self, room, first_visit, hp):
+        self.room = room         # the Room object, so renderers can use its cache
+        self.first_visit = first_visit
+        self.hp = hp
+
+class CommandIssued(Event):
+    """
+    A command the player typed, before it is handled.
+    """
+    __slots__ = ("command", "location")
+    def __init__(self, command, location):
+        self.command = command
+        self.location = location
+
+class PlayerMoved(Event):
+    __slots__ = ("destination",)
+    def __init__(self, destination):
+        self.destination = destination
+
+class UnknownCommand(Event):
+    __slots__ = ("command",)
+    def __init__(self, command):
+        self.command = command
+
+class DidYouMean(Event):
+    __slots__ = ("command", "suggestions")
+    def __init__(self, command, suggestions):
+        self.command = command
+        self.suggestions = suggestions
+
+class HintShown(Event):
+    __slots__ = ("room", "hint")
+    def __init__(self, room, hint):
+        self.room = room
+        self.hint = hint
+
+class HelpShown(Event):
+    __slots__ = ()
+
+class MapShown(Event):
+    __slots__ = ("rooms", "layout", "location")
+    def __init__(self, rooms, layout, location):
+        self.rooms = rooms
+        self.layout = layout      # mapview.MapLayout of the visited rooms
+        self.location = location
+
+class MapUnavailable(Event):
+    __slots__ = ()
+
+class RiddleAsked(Event):
+    __slots__ = ("room", "question")
+    def __init__(self, room, question):
+        self.room = room
+        self.question = question
+
+class RiddleAnswered(Event):
+    __slots__ = ("room", "correct", "unlocked")
+    def __init__(self, room, correct, unlocked=None):
+        self.room = room
+        self.correct = correct
+        self.unlocked = unlocked  # name of the room the answer opened, if any
+
+class ChestLocked(Event):
+    __slots__ = ()
+
+class NoChestHere(Event):
+    __slots__ = ()
+
+
+# --- Items ---
+
+class InventoryShown(Event):
+    __slots__ = ("items",)
+    def __init__(self, items):
+        self.items = items
+
+class ItemPicked(Event):
+    __slots__ = ("item",)
+    def __init__(self, item):
+        self.item = item
+
+class ItemNotHere(Event):
+    __slots__ = ("item",)
+    def __init__(self, item):
+        self.item = item
+
+class ItemNotCarried(Event):
+    __slots__ = ("item",)
+    def __init__(self, item):
+        self.item = item
+
+class ItemUnusable(Event):
+    __slots__ = ("item",)
+    def __init__(self, item):
+        self.item = item
+
+class ItemUsed(Event):
+    __slots__ = ("item", "item_type", "description", "hp")
+    def __init__(self, item, item_type, description, hp):
+        self.item = item
+        self.item_type = item_type
+        self.description = description
+        self.hp = hp
+
+
+# --- Combat & Hazards ---
+
+class EnemyAppeared(Event):
+    __slots__ = ("enemy", "hp", "attack")
+    def __init__(self, enemy, hp=0, attack=0):
+        self.enemy = enemy
+        self.hp = hp
+        self.attack = attack
+
+class CombatRound(Event):
+    """
+    The player's half of a combat round: "attack", "defend" or "run".
+    """
+    __slots__ = ("enemy", "action", "damage", "enemy_hp", "escaped")
+    def __init__(self, enemy, action, damage=0, enemy_hp=0, escaped=False):
+        self.enemy = enemy
+        self.action = action
+        self.damage = damage
+        self.enemy_hp = enemy_hp
+        self.escaped = escaped
+
+class InvalidAction(Event):
+    __slots__ = ("action",)
+    def __init__(self, action):
+        self.action = action
+
+class CombatCancelled(Event):
+    __slots__ = ("enemy",)
+    def __init__(self, enemy):
+        self.enemy = enemy
+
+class EnemyDefeated(Event):
+    __slots__ = ("enemy",)
+    def __init__(self, enemy):
+        self.enemy = enemy
+
+class DamageTaken(Event):
+    __slots__ = ("source", "amount", "hp")
+    def __init__(self, source, amount, hp):
+        self.source = source     # "cold" or the enemy's name
+        self.amount = amount
+        self.hp = hp
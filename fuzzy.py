@@ -0,0 +1,163 @@
+"""
+Typo-tolerant name lookup.
+
+NameIndex keeps a precomputed bigram signature for every name the game knows
+about (items, rooms, command verbs). A lookup first discards names that
+cannot be within the allowed edit distance (length and shared-bigram count
+filters), then verifies the few survivors with a bounded edit distance
+(Levenshtein plus swaps of adjacent letters). Names are added and removed
+incrementally; nothing is rebuilt.
+"""
+
+def edit_distance(a, b, limit=None):
+    """
+    Optimal string alignment distance between a and b: Levenshtein plus
+    swapping two adjacent letters as one edit ("caev" -> "cave").
+    If `limit` is given, stop early and return limit + 1 once the distance
+    is known to exceed it.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    if not b:
+        return len(a)
+
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            cost = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb and before[j - 2] + 1 < cost:
+                cost = before[j - 2] + 1
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+        if limit is not None and row_min > limit:
+            return limit + 1
+        before, previous = previous, current
+    if limit is not None and previous[-1] > limit:
+        return limit + 1
+    return previous[-1]
+
+def bigrams(word):
+    """
+    Padded bigrams of word, numbered by occurrence so that set intersection
+    behaves like multiset intersection ("^a", "ab", ..., "b$", "ab#2", ...).
+    """
+    padded = f"^{word}$"
+    seen = {}
+    grams = set()
+    for i in range(len(padded) - 1):
+        gram = padded[i:i + 2]
+        n = seen.get(gram, 0) + 1
+        seen[gram] = n
+        grams.add(gram if n == 1 else f"{gram}#{n}")
+    return frozenset(grams)
+
+
+class NameIndex:
+    """
+    Incremental bigram index over names, with reference counts so the same
+    name can be added by several sources (rooms, inventories) and only
+    disappears when the last one discards it.
+    """
+    # Below this many candidates, filtering them directly beats walking postings
+    SCAN_LIMIT = 64
+
+    def __init__(self, names=()):
+        self.grams = {}       # name -> bigram signature
+        self.postings = {}    # bigram -> set of names
+        self.refs = {}        # name -> reference count
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, name):
+        return name in self.grams
+
+    def __len__(self):
+        return len(self.grams)
+
+    def add(self, name):
+        if name in self.refs:
+            self.refs[name] += 1
+            return
+        self.refs[name] = 1
+        grams = bigrams(name)
+        self.grams[name] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(name)
+
+    def discard(self, name):
+        count = self.refs.get(name)
+        if count is None:
+            return
+        if count > 1:
+            self.refs[name] = count - 1
+            return
+        del self.refs[name]
+        for gram in self.grams.pop(name):
+            names = self.postings[gram]
+            names.discard(name)
+            if not names:
+                del self.postings[gram]
+
+    def search(self, word, max_distance, within=None):
+        """
+        Return [(distance, name), ...] for indexed names within max_distance
+        of word, closest first. `within` restricts the result to a set of
+        names (e.g. what is in the current room); names in it that are not
+        indexed yet are added on the fly.
+        """
+        query = bigrams(word)
+        # q-gram lemma: an insert, delete or substitution destroys at most two
+        # bigrams, a swap of adjacent letters three
+        slack = 1 - 3 * max_distance
+
+        if within is not None:
+            for name in within:
+                if name not in self.grams:
+                    self.add(name)
+
+        if within is not None and len(within) <= self.SCAN_LIMIT:
+            pool = within
+        elif len(word) + slack <= 0:
+            # A word this short can match names it shares no bigram with
+            pool = self.grams if within is None else within
+        else:
+            pool = None
+
+        if pool is not None:
+            candidates = []
+            for name in pool:
+                if abs(len(name) - len(word)) > max_distance:
+                    continue
+                if len(query & self.grams[name]) >= max(len(name), len(word)) + slack:
+                    candidates.append(name)
+        else:
+            counts = {}
+            for gram in query:
+                for name in self.postings.get(gram, ()):
+                    counts[name] = counts.get(name, 0) + 1
+            candidates = [
+                name for name, shared in counts.items()
+                if abs(len(name) - len(word)) <= max_distance
+                and shared >= max(len(name), len(word)) + slack
+                and (within is None or name in within)
+            ]
+
+        found = []
+        for name in candidates:
+            d = edit_distance(word, name, max_distance)
+            if d <= max_distance:
+                found.append((d, name))
+        found.sort()
+        return found
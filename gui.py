@@ -1,201 +1,187 @@
+import os
 import random
-import json
+import threading
 import time
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import messagebox, simpledialog, ttk
+
+import combat_odds
+import events
+import hotreload
+import main
+import mapview
+from main import (
+    ConsoleRenderer, Player, Room, RoomTemplate, closest_names, name_index, raw_rooms_data,
+    room_templates, rooms, items_data,
+    show_room, handle_pickup, handle_combat, handle_open_chest, show_hint, show_map,
+    save_game, load_game, GOBLIN_ATTACK, GOBLIN_HP,
+)
+
+RELOAD_POLL_MS = 1000
+LOAD_POLL_MS = 50
+
+def _process_age():
+    """
+    Seconds since this process started (Linux), or 0 where that isn't known.
+    """
+    try:
+        with open("/proc/self/stat", "r") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+# perf_counter() value at process start, for the startup report
+PROCESS_START = time.perf_counter() - _process_age()
 
 # ----------------------------
-#   Game Logic (same as before)
+#   Event Rendering (Tk)
 # ----------------------------
 
-class Enemy:
-    def __init__(self, name, hp, attack):
-        self.name = name
-        self.hp = hp
-        self.attack = attack
-
-class Room:
-    def __init__(self, name, data):
-        self.name = name
-        self.description = data["description"]
-        self.items = data.get("items", []).copy()
-        self.connections = data.get("connections", []).copy()
-        self.hints = data.get("hints", "")
-        self.visited = False
-
-    def remove_item(self, item_name):
-        if item_name in self.items:
-            self.items.remove(item_name)
-
-    def add_connection(self, new_room_name):
-        if new_room_name not in self.connections:
-            self.connections.append(new_room_name)
-
-    def to_dict(self):
-        return {
-            "items": self.items,
-            "connections": self.connections,
-            "visited": self.visited
-        }
-
-    def load_dynamic(self, data):
-        self.items = data.get("items", []).copy()
-        self.connections = data.get("connections", []).copy()
-        self.visited = data.get("visited", False)
-
-
-class Player:
-    def __init__(self, start_location, hp=10):
-        self.location = start_location
-        self.hp = hp
-        self.inventory = []
-
-    def move_to(self, new_location):
-        self.location = new_location
-
-    def pick_up(self, item_name):
-        self.inventory.append(item_name)
-
-    def use_item(self, item_name, items_data):
-        if item_name not in self.inventory:
-            return f"⚠️ You don’t have {item_name} in your inventory."
-
-        item = items_data.get(item_name)
-        if not item:
-            return f"⚠️ You can’t use {item_name} now."
-
-        item_type = item.get("type")
-        desc = item.get("description", "You use the item.")
-
-        if item_type == "healing":
-            heal_amt = item.get("heal_amount", 0)
-            self.hp += heal_amt
-            self.inventory.remove(item_name)
-            return f"✨ {desc}\n❤️ Your HP is now {self.hp}."
-        elif item_type == "light":
-            return f"✨ {desc}"
-        elif item_type == "weapon":
-            return f"✨ {desc}"
-        elif item_type == "armor":
-            return f"✨ {desc}"
-        elif item_type == "mystical":
-            return f"✨ {desc}"
-        elif item_type == "unlock":
-            return f"✨ {desc}"
-        else:
-            return "❔ You’re not sure what effect this has…"
+class TkRenderer(ConsoleRenderer):
+    """
+    Renders engine events into the window. Most events become a line in the
+    console log (reusing the console wording); a few update the room panel
+    or pop up a dialog instead.
+    """
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
 
-    def attack_power(self, items_data):
-        base = 1
-        for item_name in self.inventory:
-            item = items_data.get(item_name)
-            if item and item.get("type") == "weapon":
-                base += item.get("damage", 0)
-        return base
+    def __call__(self, event):
+        show = getattr(self, "show_" + type(event).__name__, None)
+        if show is not None:
+            show(event)
+            return
+        text = self.format(event)
+        if text is not None:
+            self.app.log(text.strip("\n"))
+
+    def show_RoomEntered(self, event):
+        room = event.room
+        self.app.room_label.config(text=room.name)
+        self.app.text_widget.config(state=tk.NORMAL)
+        self.app.text_widget.delete("1.0", tk.END)
+        if event.first_visit:
+            self.app.text_widget.insert(tk.END, room.description + "\n")
+        else:
+            self.app.text_widget.insert(tk.END, f"You return to the {room.name}.\n")
+        self.app.text_widget.config(state=tk.DISABLED)
 
-    def defense_bonus(self, items_data):
-        bonus = 0
-        for item_name in self.inventory:
-            item = items_data.get(item_name)
-            if item and item.get("type") == "armor":
-                bonus += item.get("defense", 0)
-        return bonus
+    def show_HintShown(self, event):
+        messagebox.showinfo("Hint", event.hint or "No hint for this room.")
 
+    def show_MapShown(self, event):
+        self.app.open_map()
 
-# ----------------------------
-#   Load & Randomize Rooms
-# ----------------------------
+    def show_MapUnavailable(self, event):
+        messagebox.showwarning("No Map", "⚠️ You need to pick up the map first.")
 
-def load_rooms_raw(filename):
-    with open(filename, "r") as f:
-        return json.load(f)
+    def show_EnemyAppeared(self, event):
+        self.app.log(self.format(event).strip("\n"))
+        self.app.enemy = (event.hp, event.attack)
 
-def load_items(filename):
-    with open(filename, "r") as f:
-        return json.load(f)
+    def show_CombatRound(self, event):
+        self.app.log(self.format(event).strip("\n"))
+        self.app.enemy = (event.enemy_hp, self.app.enemy[1])
 
-raw_rooms_data = load_rooms_raw("rooms.json")
-items_data = load_items("items.json")
+    def show_SaveMissing(self, event):
+        messagebox.showwarning("No Save", "⚠️ No save file found.")
 
-# Preserve item counts per room, then shuffle pool
-room_item_counts = { name: len(d.get("items", [])) for name, d in raw_rooms_data.items() }
-all_items = []
-for d in raw_rooms_data.values():
-    all_items.extend(d.get("items", []))
-random.shuffle(all_items)
+    def show_InvalidSaveName(self, event):
+        messagebox.showwarning("Invalid Slot", self.format(event).strip("\n"))
 
-new_rooms_data = {}
-idx = 0
-for room_name, data in raw_rooms_data.items():
-    count = room_item_counts[room_name]
-    assigned = all_items[idx: idx + count]
-    idx += count
-    new_rooms_data[room_name] = {
-        "description": data["description"],
-        "items": assigned,
-        "connections": data["connections"],
-        "hints": data.get("hints", "")
-    }
+    def show_GameWon(self, event):
+        messagebox.showinfo("Victory", "🎉 You use the key and claim the treasure!\n\nCongratulations—you win!")
+        self.app.quit()
 
-rooms = { name: Room(name, info) for name, info in new_rooms_data.items() }
+    def show_PlayerDied(self, event):
+        self.app.log(self.format(event).strip("\n"))
+        messagebox.showinfo("Game Over", "💀 Your adventure ends here.")
+        self.app.quit()
 
 
 # ----------------------------
-#   Turn-Based Combat (returns a string)
+#   Map Window
 # ----------------------------
 
-def handle_combat(player):
-    goblin = Enemy(name="Goblin", hp=5, attack=1)
-    log = ["⚔️ A wild Goblin appears!"]
-    time.sleep(0.5)
-
-    while player.hp > 0 and goblin.hp > 0:
-        # For GUI, we ask the player via a simple dialog prompt:
-        action = simpledialog.askstring(
-            "Combat",
-            "Choose: [attack], [defend], or [run]:"
-        )
-        if action is None:
-            return "\n⚠️ Combat canceled."
-        action = action.strip().lower()
-
-        if action == "attack":
-            pa = player.attack_power(items_data)
-            goblin.hp -= pa
-            log.append(f"✅ You strike the Goblin for {pa} damage!")
-            if goblin.hp > 0:
-                log.append(f"   Goblin HP now {goblin.hp}.")
-            else:
-                log.append("   Goblin is defeated!")
-        elif action == "defend":
-            log.append("🛡️ You brace for the Goblin’s next attack (–1 dmg).")
-            defending = True
-        elif action == "run":
-            if random.random() < 0.5:
-                log.append("🏃 You managed to flee safely!")
-                return "\n".join(log)
-            else:
-                log.append("⚠️ You couldn't escape!")
-                defending = False
+class MapWindow(tk.Toplevel):
+    """
+    Canvas view of a mapview.MapLayout. Only rooms and passages added since
+    the last update are drawn; the whole canvas is redrawn only after the
+    layout is reset (load / undo).
+    """
+    SPACING = 130
+    BOX_W, BOX_H = 110, 30
+
+    def __init__(self, app, layout):
+        super().__init__(app)
+        self.title("World Map")
+        self.geometry("640x480")
+        self.layout = layout
+        self.token = None
+        self.boxes = {}         # room name -> rectangle item id
+        self.current = None
+
+        self.canvas = tk.Canvas(self, background="white")
+        xbar = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        ybar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.config(xscrollcommand=xbar.set, yscrollcommand=ybar.set)
+        xbar.pack(side=tk.BOTTOM, fill=tk.X)
+        ybar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+    def _centre(self, name):
+        x, y = self.layout.positions[name]
+        return x * self.SPACING, y * self.SPACING
+
+    def _draw_room(self, name):
+        x, y = self._centre(name)
+        w, h = self.BOX_W // 2, self.BOX_H // 2
+        self.boxes[name] = self.canvas.create_rectangle(x - w, y - h, x + w, y + h, fill="white", tags="room")
+        self.canvas.create_text(x, y, text=name, width=self.BOX_W - 6, tags="room")
+
+    def _draw_edge(self, a, b):
+        self.canvas.create_line(*self._centre(a), *self._centre(b), fill="gray40", tags="edge")
+
+    def update_view(self, location):
+        changes, self.token = self.layout.changes(self.token)
+        if changes is None:
+            self.canvas.delete("all")
+            self.boxes.clear()
+            self.current = None
+            for name in self.layout.positions:
+                self._draw_room(name)
+            for a, targets in self.layout.edges.items():
+                for b in targets:
+                    if a < b:
+                        self._draw_edge(a, b)
         else:
-            log.append("⚠️ Invalid choice; try attack/defend/run.")
-            continue  # Skip Goblin’s turn
-
-        # Goblin’s turn
-        if goblin.hp > 0:
-            dmg = goblin.attack
-            if action == "defend":
-                dmg = max(dmg - 1, 0)
-            dmg = max(dmg - player.defense_bonus(items_data), 0)
-            player.hp -= dmg
-            log.append(f"⚠️ Goblin hits you for {dmg} damage (Your HP: {player.hp})")
-            if player.hp <= 0:
-                log.append("💀 You were defeated by the Goblin. Game over!")
-                return "\n".join(log)
-        time.sleep(0.2)
-
-    log.append("🎉 You have slain the Goblin!")
-    return "\n".join(log)
+            for change in changes:
+                if change[0] == "room":
+                    self._draw_room(change[1])
+                else:
+                    self._draw_edge(change[1], change[2])
+        self.canvas.tag_lower("edge")
+
+        if self.current in self.boxes:
+            self.canvas.itemconfig(self.boxes[self.current], fill="white")
+        self.current = location
+        if location in self.boxes:
+            self.canvas.itemconfig(self.boxes[location], fill="gold")
+
+        # Keep the player's room in the middle of the window
+        bbox = self.canvas.bbox("all")
+        if bbox is None or location not in self.layout.positions:
+            return
+        pad = self.SPACING
+        x0, y0, x1, y1 = bbox[0] - pad, bbox[1] - pad, bbox[2] + pad, bbox[3] + pad
+        self.canvas.config(scrollregion=(x0, y0, x1, y1))
+        x, y = self._centre(location)
+        self.canvas.xview_moveto((x - x0 - self.canvas.winfo_width() / 2) / (x1 - x0))
+        self.canvas.yview_moveto((y - y0 - self.canvas.winfo_height() / 2) / (y1 - y0))
 
 
 # ----------------------------
@@ -207,9 +193,17 @@ class AdventureGUI(tk.Tk):
         super().__init__()
         self.title("Mini Adventure Game")
         self.geometry("800x600")
+        # The engine runs on the Tk thread: its dramatic pauses would freeze the window
+        main.set_delays(False)
         self.player = player
         self.rooms = rooms
+        self.enemy = (GOBLIN_HP, GOBLIN_ATTACK)   # (hp, attack) of the current fight, from combat events
         self.items_data = items_data
+        self.renderer = TkRenderer(self)
+        self.map_layout = mapview.MapLayout(rooms)
+        self.bus = events.EventBus([self.renderer, self.map_layout])
+        self.rng = random.Random()
+        self.map_window = None
 
         # ----- Top Frame: Room Description -----
         self.desc_frame = tk.Frame(self)
@@ -293,8 +287,86 @@ class AdventureGUI(tk.Tk):
         self.mid_frame.grid_columnconfigure(0, weight=1)
         self.mid_frame.grid_columnconfigure(1, weight=1)
 
+        # Startup timing: shown as soon as the window is mapped, playable once the world is in
+        self.startup = {"window": None, "world": None, "interactive": None}
+        self.bind("<Map>", self.first_frame, add="+")
+
+        # Load the world in the background; the map window and the content
+        # watcher are only created once they can be used
+        self.watcher = None
+        self.loading = {"fraction": 0.0, "message": "Starting", "done": False, "error": None}
+        self.progress = ttk.Progressbar(self.desc_frame, maximum=1.0, mode="determinate")
+        self.progress.pack(fill=tk.X, pady=(5, 0))
+        self.room_label.config(text="Loading world…")
+        self.set_controls(tk.DISABLED)
+        threading.Thread(target=self.load_world, daemon=True).start()
+        self.after(LOAD_POLL_MS, self.poll_loading)
+
+
+    def set_controls(self, state):
+        for button in (self.hint_button, self.map_button, self.save_button, self.load_button,
+                       self.pick_button, self.use_button, self.fight_button, self.open_button):
+            button.config(state=state)
+
+
+    def first_frame(self, event):
+        if self.startup["window"] is None:
+            self.startup["window"] = time.perf_counter() - PROCESS_START
+
+
+    def load_world(self):
+        """
+        Runs on a background thread; the Tk thread only reads self.loading.
+        """
+        def progress(fraction, message):
+            self.loading.update(fraction=fraction, message=message)
+        began = time.perf_counter()
+        try:
+            main.load_world(progress=progress)
+        except Exception as e:
+            self.loading["error"] = e
+        self.startup["world"] = time.perf_counter() - began
+        self.loading["done"] = True
+
+
+    def poll_loading(self):
+        self.progress.config(value=self.loading["fraction"])
+        if not self.loading["done"]:
+            self.room_label.config(text=f"Loading world… {self.loading['message']}")
+            self.after(LOAD_POLL_MS, self.poll_loading)
+            return
+        if self.loading["error"] is not None:
+            messagebox.showerror("Loading failed", f"⚠️ Could not load the world:\n{self.loading['error']}")
+            self.destroy()
+            return
+        self.finish_startup()
+
+
+    def finish_startup(self):
+        self.progress.destroy()
+        self.set_controls(tk.NORMAL)
+
+        # Pick up edits to rooms.json / items.json while the window is open
+        self.watcher = hotreload.ContentWatcher(
+            raw_rooms_data, items_data, room_templates, RoomTemplate, Room, on_new_name=name_index.add
+        )
+        self.watcher.register(self.rooms, [self.player])
+        self.after(RELOAD_POLL_MS, self.poll_content)
+
         # Finally, draw the initial room state
         self.refresh_ui()
+        self.update_idletasks()
+        self.startup["interactive"] = time.perf_counter() - PROCESS_START
+        self.report_startup()
+
+
+    def report_startup(self):
+        times = self.startup
+        window = "?" if times["window"] is None else f"{times['window'] * 1000:.0f} ms"
+        text = (f"⏱️  Startup: window after {window}, playable after {times['interactive'] * 1000:.0f} ms "
+                f"(world loaded in {times['world'] * 1000:.0f} ms)")
+        print(text)
+        self.log(text)
 
 
     def refresh_ui(self):
@@ -304,18 +376,8 @@ class AdventureGUI(tk.Tk):
         """
         current_room = self.rooms[self.player.location]
 
-        # — Update Room Name & Description —
-        self.room_label.config(text=current_room.name)
-        self.text_widget.config(state=tk.NORMAL)
-        self.text_widget.delete("1.0", tk.END)
-
-        if not current_room.visited:
-            self.text_widget.insert(tk.END, current_room.description + "\n")
-            current_room.visited = True
-        else:
-            self.text_widget.insert(tk.END, f"You return to the {current_room.name}.\n")
-
-        self.text_widget.config(state=tk.DISABLED)
+        # — Update Room Name & Description (rendered from the RoomEntered event) —
+        show_room(self.bus, self.player, self.rooms)
 
         # — Update Room's Items Listbox —
         self.room_items_list.delete(0, tk.END)
@@ -335,6 +397,16 @@ class AdventureGUI(tk.Tk):
             btn = tk.Button(self.move_frame, text=target, command=lambda t=target: self.move_player(t))
             btn.pack(side=tk.LEFT, padx=2, pady=2)
 
+        # — Keep an open map in step with the player —
+        if self.map_window is not None:
+            self.map_window.update_view(self.player.location)
+
+
+    def poll_content(self):
+        if self.watcher.check():
+            self.refresh_ui()
+        self.after(RELOAD_POLL_MS, self.poll_content)
+
 
     def move_player(self, room_name):
         self.player.move_to(room_name)
@@ -351,9 +423,7 @@ class AdventureGUI(tk.Tk):
             messagebox.showwarning("No selection", "Select an item in the room to pick up.")
             return
         item_name = self.room_items_list.get(sel[0])
-        self.player.pick_up(item_name)
-        self.rooms[self.player.location].remove_item(item_name)
-        self.log(f"✅ Picked up {item_name}.")
+        handle_pickup(self.bus, self.player, self.rooms, item_name)
         self.refresh_ui()
 
 
@@ -379,11 +449,14 @@ class AdventureGUI(tk.Tk):
                 match = itm
                 break
         if not match:
-            messagebox.showwarning("Not in inventory", f"You don't have '{item_name}'.")
+            message = f"You don't have '{item_name}'."
+            suggestions = closest_names(item_name, set(self.player.inventory))
+            if suggestions:
+                message += " Did you mean " + " or ".join(f"'{s}'" for s in suggestions) + "?"
+            messagebox.showwarning("Not in inventory", message)
             return
 
-        result = self.player.use_item(match, self.items_data)
-        self.log(result)
+        self.player.use_item(self.bus, match, self.items_data)
         self.refresh_ui()
 
 
@@ -392,90 +465,83 @@ class AdventureGUI(tk.Tk):
         Called when “Fight” is clicked.
         Runs the turn‐based combat and prints the log.
         """
-        combat_log = handle_combat(self.player)
-        self.log(combat_log)
+        handle_combat(self.bus, self.player, self.ask_combat_action, self.rng)
         self.refresh_ui()
 
 
+    def ask_combat_action(self, prompt):
+        """
+        Combat input for the engine: a simple dialog prompt (None if cancelled).
+        """
+        return simpledialog.askstring("Combat", self.combat_odds_text() + "\n\nChoose: [attack], [defend], or [run]:")
+
+
+    def combat_odds_text(self):
+        """
+        Exact odds for each action from the current state of the fight (see combat_odds).
+        """
+        enemy_hp, enemy_attack = self.enemy
+        attack = self.player.attack_power(self.items_data)
+        defense = self.player.defense_bonus(self.items_data)
+        best = combat_odds.recommended_action(self.player.hp, enemy_hp, attack, defense, enemy_attack)
+        outcomes = combat_odds.action_outcomes(self.player.hp, enemy_hp, attack, defense, enemy_attack)
+        lines = [f"Goblin HP {enemy_hp} · your HP {self.player.hp}"]
+        for action, o in outcomes.items():
+            mark = "  ← best" if action == best else ""
+            stall = f", stalls {o.stalemate:.0%}" if o.stalemate else ""
+            lines.append(f"{action}: win {o.win:.0%}, flee {o.flee:.0%}, die {o.death:.0%}{stall}{mark}")
+        return "\n".join(lines)
+
+
     def open_chest(self):
         """
         Called when “Open Chest” is clicked.
         Checks if in Hidden Chamber and if player has a key.
         """
-        if self.player.location == "Hidden Chamber":
-            if "key" in self.player.inventory:
-                messagebox.showinfo("Victory", "🎉 You use the key and claim the treasure!\n\nCongratulations—you win!")
-                self.quit()
-            else:
-                self.log("⚠️ The chest is locked; you need a key.")
-        else:
-            self.log("⚠️ There is no chest here.")
+        handle_open_chest(self.bus, self.player, self.rooms)
 
 
     def show_hint(self):
         """
         Show the hint for the current room.
         """
-        hint_text = self.rooms[self.player.location].hints
-        if hint_text:
-            messagebox.showinfo("Hint", hint_text)
-        else:
-            messagebox.showinfo("Hint", "No hint for this room.")
+        show_hint(self.bus, self.player, self.rooms)
 
 
     def show_map(self):
         """
-        Display a simple text map if player has a 'map'.
+        Open the map window if player has a 'map'.
         """
-        if "map" in self.player.inventory:
-            lines = ["🗺️  World Map:"]
-            for r in self.rooms.values():
-                lines.append(f"  - {r.name} → {', '.join(r.connections)}")
-            messagebox.showinfo("World Map", "\n".join(lines))
-        else:
-            messagebox.showwarning("No Map", "⚠️ You need to pick up the map first.")
+        show_map(self.bus, self.rooms, self.player, self.map_layout)
+
+
+    def open_map(self):
+        if self.map_window is None:
+            self.map_window = MapWindow(self, self.map_layout)
+            self.map_window.protocol("WM_DELETE_WINDOW", self.close_map)
+            self.map_window.update_idletasks()
+        self.map_window.update_view(self.player.location)
+        self.map_window.lift()
+
+
+    def close_map(self):
+        self.map_window.destroy()
+        self.map_window = None
 
 
     def save_game(self):
         """
         Save player and room dynamic state.
         """
-        rooms_dynamic = { name: room.to_dict() for name, room in self.rooms.items() }
-        data = {
-            "player": {
-                "location": self.player.location,
-                "inventory": self.player.inventory,
-                "hp": self.player.hp
-            },
-            "rooms": rooms_dynamic
-        }
-        with open("savegame.json", "w") as f:
-            json.dump(data, f)
-        self.log("💾 Game saved.")
+        save_game(self.bus, self.player, self.rooms)
 
 
     def load_game(self):
         """
         Load player and room dynamic state.
         """
-        try:
-            with open("savegame.json", "r") as f:
-                data = json.load(f)
-
-                # Restore player
-                self.player.location = data["player"]["location"]
-                self.player.inventory = data["player"]["inventory"]
-                self.player.hp = data["player"]["hp"]
-
-                # Restore rooms
-                for name, rd in data["rooms"].items():
-                    if name in self.rooms:
-                        self.rooms[name].load_dynamic(rd)
-
-            self.log("💾 Game loaded.")
-            self.refresh_ui()
-        except FileNotFoundError:
-            messagebox.showwarning("No Save", "⚠️ No save file found.")
+        load_game(self.bus, self.player, self.rooms)
+        self.refresh_ui()
 
 
     def quit_game(self):
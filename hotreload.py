@@ -0,0 +1,225 @@
+"""
+Hot reload of rooms.json and items.json into running sessions.
+
+ContentWatcher polls the files' modification times. When either changes it
+reloads it, works out what changed compared to the last version it applied,
+and patches every registered session in place:
+
+  - room descriptions and hints are replaced,
+  - connections added to / removed from the file are added / removed,
+  - new rooms are created and removed rooms dropped,
+  - item stats are updated in the shared items dict.
+
+Each session's dynamic state is kept: the items lying in its rooms, which
+rooms it has visited and connections it opened itself (e.g. the Cave riddle).
+Item lists of existing rooms are dynamic state, so edits to them only affect
+rooms that are new in the file.
+
+Call check() from the game loop (or a timer); it costs two os.stat calls
+when nothing changed.
+"""
+
+import json
+import os
+
+
+def diff_rooms(old, new):
+    """
+    Compare two raw rooms dicts (as loaded from rooms.json).
+    Returns {"added": {name: data}, "removed": [names], "changed": {name: changes}}
+    where changes may hold "description", "hints", "connections_added" and
+    "connections_removed".
+    """
+    added = {name: data for name, data in new.items() if name not in old}
+    removed = [name for name in old if name not in new]
+    changed = {}
+    for name, data in new.items():
+        if name not in old:
+            continue
+        before = old[name]
+        changes = {}
+        if data.get("description") != before.get("description"):
+            changes["description"] = data.get("description", "")
+        if data.get("hints", "") != before.get("hints", ""):
+            changes["hints"] = data.get("hints", "")
+        old_connections = before.get("connections", [])
+        new_connections = data.get("connections", [])
+        connections_added = [c for c in new_connections if c not in old_connections]
+        connections_removed = [c for c in old_connections if c not in new_connections]
+        if connections_added:
+            changes["connections_added"] = connections_added
+        if connections_removed:
+            changes["connections_removed"] = connections_removed
+        if changes:
+            changed[name] = changes
+    return {"added": added, "removed": removed, "changed": changed}
+
+def diff_items(old, new):
+    """
+    Compare two items dicts. Returns {"added"/"changed": {name: data}, "removed": [names]}.
+    """
+    return {
+        "added": {name: data for name, data in new.items() if name not in old},
+        "removed": [name for name in old if name not in new],
+        "changed": {name: data for name, data in new.items() if name in old and old[name] != data},
+    }
+
+def apply_templates_diff(templates, diff, template_factory):
+    """
+    Update the shared RoomTemplates (room name -> template) in place, once
+    per reload: changed rooms get a copy of their template with the changes
+    applied, added rooms a new template from template_factory(name, data).
+    Templates of removed rooms are left for the caller to drop once no
+    session uses them.
+    """
+    for name, changes in diff["changed"].items():
+        old = templates.get(name)
+        if old is None:
+            continue
+        added = changes.get("connections_added", [])
+        removed = changes.get("connections_removed", [])
+        fields = {
+            "connections": tuple(c for c in old.connections if c not in removed)
+            + tuple(c for c in added if c not in old.connections)
+        }
+        if "description" in changes:
+            fields["description"] = changes["description"]
+        if "hints" in changes:
+            fields["hints"] = changes["hints"]
+        templates[name] = old.replace(**fields)
+    for name, data in diff["added"].items():
+        templates[name] = template_factory(name, data)
+
+def apply_rooms_diff(rooms, diff, room_factory, templates, occupied=()):
+    """
+    Patch one session's rooms dict in place, pointing its rooms at the
+    shared `templates` that apply_templates_diff already updated, so every
+    session ends up on the same template per room. New rooms are built with
+    room_factory(name, template) and join the session's journal. Rooms
+    listed in `occupied` (where a player currently stands) are never removed.
+    """
+    for name, changes in diff["changed"].items():
+        room = rooms.get(name)
+        template = templates.get(name)
+        if room is None or template is None:
+            continue
+        room.set_template(template, changes.get("connections_added", []),
+                          changes.get("connections_removed", []))
+
+    # New rooms report their changes to the same journal as the rest of the
+    # session (its undo Snapshotter or shared world)
+    journal = next((room.journal for room in rooms.values() if room.journal is not None), None)
+    for name in diff["added"]:
+        if name not in rooms:
+            room = rooms[name] = room_factory(name, templates[name])
+            room.journal = journal
+
+    for name in diff["removed"]:
+        if name in rooms and name not in occupied:
+            del rooms[name]
+
+def apply_items_diff(items_data, diff):
+    """
+    Patch the shared items dict in place so every holder of it sees the change.
+    """
+    for name in diff["removed"]:
+        items_data.pop(name, None)
+    items_data.update(diff["added"])
+    items_data.update(diff["changed"])
+
+
+def _copy(data):
+    return json.loads(json.dumps(data))
+
+
+class ContentWatcher:
+    """
+    raw_rooms / items_data are the live dicts the sessions were built from
+    (main.raw_rooms_data / main.items_data) and templates the shared room
+    templates (main.room_templates); all three are updated in place, so
+    sessions started later get the new content too. template_factory and
+    room_factory (RoomTemplate, Room) build rooms added to the file, and
+    on_new_name is told about every new room or item name, including the
+    items lying in new rooms (for the typo index).
+    """
+    def __init__(self, raw_rooms, items_data, templates, template_factory, room_factory,
+                 rooms_file="rooms.json", items_file="items.json", on_new_name=None):
+        self.raw_rooms = raw_rooms
+        self.items_data = items_data
+        self.templates = templates
+        self.template_factory = template_factory
+        self.room_factory = room_factory
+        self.rooms_file = rooms_file
+        self.items_file = items_file
+        self.on_new_name = on_new_name
+        # Last applied version of each file, to diff against
+        self.rooms_snapshot = _copy(raw_rooms)
+        self.items_snapshot = _copy(items_data)
+        self.sessions = []     # [(rooms dict, [players])]
+        self.stamps = {path: self._stamp(path) for path in (rooms_file, items_file)}
+
+    def register(self, rooms, players=()):
+        self.sessions.append((rooms, list(players)))
+
+    def unregister(self, rooms):
+        self.sessions = [s for s in self.sessions if s[0] is not rooms]
+
+    def _stamp(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, path):
+        """
+        Read a JSON file; None if it is missing or half-written (retried next check).
+        """
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def check(self):
+        """
+        Apply any content change since the last check. Returns True if something was applied.
+        """
+        applied = False
+
+        stamp = self._stamp(self.items_file)
+        if stamp != self.stamps[self.items_file]:
+            new_items = self._load(self.items_file)
+            if new_items is not None:
+                self.stamps[self.items_file] = stamp
+                diff = diff_items(self.items_snapshot, new_items)
+                apply_items_diff(self.items_data, diff)
+                if self.on_new_name:
+                    for name in diff["added"]:
+                        self.on_new_name(name)
+                self.items_snapshot = new_items
+                applied = True
+
+        stamp = self._stamp(self.rooms_file)
+        if stamp != self.stamps[self.rooms_file]:
+            new_rooms = self._load(self.rooms_file)
+            if new_rooms is not None:
+                self.stamps[self.rooms_file] = stamp
+                diff = diff_rooms(self.rooms_snapshot, new_rooms)
+                apply_templates_diff(self.templates, diff, self.template_factory)
+                for rooms, players in self.sessions:
+                    occupied = {player.location for player in players}
+                    apply_rooms_diff(rooms, diff, self.room_factory, self.templates, occupied)
+                for name in diff["removed"]:
+                    self.templates.pop(name, None)
+                if self.on_new_name:
+                    for name, data in diff["added"].items():
+                        self.on_new_name(name.lower())
+                        for item in data.get("items", []):
+                            self.on_new_name(item)
+                self.raw_rooms.clear()
+                self.raw_rooms.update(new_rooms)
+                self.rooms_snapshot = _copy(new_rooms)
+                applied = True
+
+        return applied
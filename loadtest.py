@@ -0,0 +1,453 @@
+"""
+Load tester: how many players can one host run?
+
+Drives N concurrent sessions with random (or scripted) commands and
+measures, for each N of a ramp:
+
+- per-turn latency p50 / p99: from sending a command to the next prompt;
+- throughput: turns per second across all sessions;
+- CPU: CPU-seconds used per wall second (1.0 = one busy core);
+- RSS: peak resident memory, total and per session.
+
+Two modes:
+
+    python loadtest.py --mode process --ramp 1,2,4,8,16 --duration 10
+    python loadtest.py --mode inprocess --ramp 1,10,100 --duration 10
+
+"process" runs each session as its own `main.py --no-delay --player sN`
+and talks to it over stdin/stdout; that includes interpreter start-up and
+console rendering, the way players run the game today. "inprocess" runs sessions
+as threads of this process on headless engine sessions (no rendering),
+which is what a game server hosting many players would do.
+
+Saves go to a scratch directory, never the real savegame.json, and every
+session saves as its own player (s0, s1, ...). Sessions that end (death,
+win) are restarted. Everything runs locally;
+results are printed and written to --report as JSON.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import selectors
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import analytics
+import events
+import main
+import saves
+import snapshots
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PROMPTS = {
+    main.COMMAND_PROMPT.encode(): "command",
+    main.COMBAT_PROMPT.encode(): "combat",
+    main.RIDDLE_PROMPT.encode(): "riddle",
+}
+
+
+# ----------------------------
+#   Command Streams
+# ----------------------------
+
+class RandomCommands:
+    """
+    Random player input: mostly moves and item commands, some lookups and
+    fights, and the odd typo. `location` (when known) makes most moves valid.
+    """
+    SIMPLE = ("view inventory", "map", "hint", "help", "fight", "open chest", "undo", "save", "load")
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.room_names = list(main.raw_rooms_data)
+        self.item_names = list(main.items_data)
+
+    def command(self, location=None):
+        rng = self.rng
+        roll = rng.random()
+        if roll < 0.45:
+            connections = main.raw_rooms_data.get(location, {}).get("connections")
+            if connections and rng.random() < 0.8:
+                return rng.choice(connections).lower()
+            return rng.choice(self.room_names).lower()
+        if roll < 0.65:
+            return f"pick up {rng.choice(self.item_names)}"
+        if roll < 0.75:
+            return f"use {rng.choice(self.item_names)}"
+        if roll < 0.97:
+            return rng.choice(self.SIMPLE)
+        return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(6))
+
+    def reply(self, kind, location=None):
+        if kind == "combat":
+            return self.rng.choice(("attack", "attack", "defend", "run"))
+        if kind == "riddle":
+            return self.rng.choice((main.RIDDLE_ANSWER, "a shadow"))
+        return self.command(location)
+
+
+class ScriptedCommands:
+    """
+    Replays a script (one command per line) in a loop; prompts inside
+    combat or the riddle take the next line too, as they would from stdin.
+    """
+    def __init__(self, lines, offset=0):
+        self.lines = lines
+        self.position = offset % len(lines)
+
+    def reply(self, kind, location=None):
+        line = self.lines[self.position]
+        self.position = (self.position + 1) % len(self.lines)
+        return line
+
+
+# ----------------------------
+#   Measurements
+# ----------------------------
+
+def rss_kb(pid="self"):
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+    return 0
+
+
+def cpu_seconds(who):
+    usage = resource.getrusage(who)
+    return usage.ru_utime + usage.ru_stime
+
+
+class StepResult:
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.latency = analytics.QuantileSketch()   # seconds per turn
+        self.startup = analytics.QuantileSketch()   # seconds to the first prompt
+        self.turns = 0
+        self.restarts = 0
+        self.timeouts = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.driver_cpu = 0.0
+        self.peak_rss_kb = 0
+        self.base_rss_kb = 0        # memory that isn't the sessions' (the idle driver, in-process)
+
+    def to_dict(self):
+        def ms(sketch, q):
+            value = sketch.quantile(q)
+            return None if value is None else round(value * 1000, 3)
+        return {
+            "sessions": self.sessions,
+            "turns": self.turns,
+            "throughput_per_s": round(self.turns / self.wall, 1) if self.wall else 0,
+            "latency_p50_ms": ms(self.latency, 0.5),
+            "latency_p99_ms": ms(self.latency, 0.99),
+            "startup_p50_ms": ms(self.startup, 0.5),
+            "cpu_cores": round(self.cpu / self.wall, 3) if self.wall else 0,
+            "driver_cpu_cores": round(self.driver_cpu / self.wall, 3) if self.wall else 0,
+            "peak_rss_mb": round(self.peak_rss_kb / 1024, 1),
+            "rss_per_session_mb": round((self.peak_rss_kb - self.base_rss_kb) / 1024 / self.sessions, 2),
+            "restarts": self.restarts,
+            "timeouts": self.timeouts,
+        }
+
+
+# ----------------------------
+#   Process Mode
+# ----------------------------
+
+class ProcessSession:
+    def __init__(self, workdir, player_id, stream, think):
+        self.workdir = workdir
+        self.player_id = player_id
+        self.stream = stream
+        self.think = think
+        self.proc = None
+        self.buffer = b""
+        self.sent_at = 0.0
+        self.send_at = None     # when the next reply is due (think time)
+        self.reply = None
+        self.starting = True
+
+    def start(self):
+        env = dict(os.environ, PYTHONIOENCODING="utf-8")
+        self.proc = subprocess.Popen(
+            [sys.executable, "main.py", "--no-delay", "--player", self.player_id],
+            cwd=self.workdir, env=env, bufsize=0,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self.buffer = b""
+        self.sent_at = time.perf_counter()
+        self.send_at = None
+        self.starting = True
+        return self.proc.stdout
+
+    def prompt(self):
+        """
+        The kind of prompt the output ends with, if the session is waiting for input.
+        """
+        for prompt, kind in PROMPTS.items():
+            if self.buffer.endswith(prompt):
+                return kind
+        return None
+
+    def send(self, now):
+        self.send_at = None
+        self.sent_at = now
+        try:
+            self.proc.stdin.write((self.reply + "\n").encode())
+        except (BrokenPipeError, OSError):
+            pass    # it just exited; the EOF restarts it
+
+    def stop(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+        self.proc.stdout.close()
+        self.proc.stdin.close()
+
+
+def scratch_copy():
+    """
+    A temporary directory with the game files, so sessions' saves stay out of the repo.
+    """
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    for name in os.listdir(HERE):
+        if name.endswith((".py", ".json")) and name != "savegame.json":
+            shutil.copy(os.path.join(HERE, name), workdir)
+    return workdir
+
+
+def run_processes(count, duration, make_stream, think, timeout, workdir):
+    result = StepResult(count)
+    selector = selectors.DefaultSelector()
+    sessions = [ProcessSession(workdir, f"s{i}", make_stream(i), think) for i in range(count)]
+    children_cpu = cpu_seconds(resource.RUSAGE_CHILDREN)
+    driver_cpu = cpu_seconds(resource.RUSAGE_SELF)
+    begin = time.perf_counter()
+    end = begin + duration
+    next_sample = begin
+
+    for s in sessions:
+        selector.register(s.start(), selectors.EVENT_READ, s)
+
+    while True:
+        now = time.perf_counter()
+        if now >= end:
+            break
+        if now >= next_sample:
+            result.peak_rss_kb = max(result.peak_rss_kb, sum(rss_kb(s.proc.pid) for s in sessions))
+            next_sample = now + 0.25
+
+        due = [s.send_at for s in sessions if s.send_at is not None]
+        wait = min([end - now, next_sample - now] + [max(0, t - now) for t in due])
+        for key, _ in selector.select(wait):
+            s = key.data
+            data = os.read(key.fd, 65536)
+            now = time.perf_counter()
+            if not data:
+                # Session over (death, win or crash): start a new one
+                selector.unregister(key.fd)
+                s.stop()
+                result.restarts += 1
+                selector.register(s.start(), selectors.EVENT_READ, s)
+                continue
+            s.buffer += data
+            kind = s.prompt()
+            if kind is None:
+                continue
+            if s.starting:
+                result.startup.add(now - s.sent_at)
+                s.starting = False
+            else:
+                result.latency.add(now - s.sent_at)
+                result.turns += 1
+            s.buffer = b""
+            s.reply = s.stream.reply(kind)
+            s.send_at = now + think
+            if not think:
+                s.send(now)
+
+        now = time.perf_counter()
+        for s in sessions:
+            if s.send_at is not None and s.send_at <= now:
+                s.send(now)
+            elif s.send_at is None and now - s.sent_at > timeout:
+                selector.unregister(s.proc.stdout)
+                s.stop()
+                result.timeouts += 1
+                selector.register(s.start(), selectors.EVENT_READ, s)
+
+    result.wall = time.perf_counter() - begin
+    result.peak_rss_kb = max(result.peak_rss_kb, sum(rss_kb(s.proc.pid) for s in sessions))
+    for s in sessions:
+        selector.unregister(s.proc.stdout)
+        s.stop()
+    selector.close()
+    result.cpu = cpu_seconds(resource.RUSAGE_CHILDREN) - children_cpu
+    result.driver_cpu = cpu_seconds(resource.RUSAGE_SELF) - driver_cpu
+    return result
+
+
+# ----------------------------
+#   In-Process Mode
+# ----------------------------
+
+class EngineSession:
+    """
+    One headless game, played the way main_game_loop plays it, with its own
+    RNG and its own player's saves.
+    """
+    def __init__(self, slots, stream, think):
+        self.slots = slots
+        self.stream = stream
+        self.think = think
+        self.rng = random.Random()
+        self.reset()
+
+    def reset(self):
+        self.player = main.Player(start_location="Forest Entrance", hp=10)
+        self.rooms = main.new_session_rooms()
+        self.history = snapshots.UndoHistory(snapshots.Snapshotter(self.player, self.rooms))
+        self.bus = events.EventBus([self.session_ended])
+        self.over = False
+
+    def session_ended(self, event):
+        if isinstance(event, events.GameEnded):
+            self.over = True
+
+    def ask(self, prompt):
+        return self.stream.reply(PROMPTS[prompt.encode()], self.player.location)
+
+    def run(self, result, go, stop, lock):
+        go.wait()
+        latency = analytics.QuantileSketch()
+        turns = restarts = 0
+        main.show_room(self.bus, self.player, self.rooms)
+        main.random_event(self.bus, self.player, self.rng)
+        while not stop.is_set():
+            if self.over:
+                self.reset()
+                restarts += 1
+                main.show_room(self.bus, self.player, self.rooms)
+                main.random_event(self.bus, self.player, self.rng)
+                continue
+            command = self.stream.reply("command", self.player.location)
+            began = time.perf_counter()
+            main.handle_command(self.bus, self.player, self.rooms, main.items_data, command,
+                                ask=self.ask, history=self.history, rng=self.rng, slots=self.slots)
+            if not self.over:
+                main.show_room(self.bus, self.player, self.rooms)
+                main.random_event(self.bus, self.player, self.rng)
+            latency.add(time.perf_counter() - began)
+            turns += 1
+            if self.think:
+                stop.wait(self.think)
+        with lock:
+            result.latency.merge(latency)
+            result.turns += turns
+            result.restarts += restarts
+
+
+def run_in_process(count, duration, make_stream, think, workdir, idle_rss_kb):
+    result = StepResult(count)
+    result.base_rss_kb = idle_rss_kb
+    main.set_headless(True)
+    go = threading.Event()
+    stop = threading.Event()
+    lock = threading.Lock()
+    sessions = [EngineSession(saves.SaveSlots(saves.JsonFileBackend(workdir), f"s{i}"), make_stream(i), think)
+                for i in range(count)]
+    threads = [threading.Thread(target=s.run, args=(result, go, stop, lock), daemon=True) for s in sessions]
+    for t in threads:
+        t.start()
+
+    # Everyone starts playing at once, so thread start-up isn't timed
+    cpu = cpu_seconds(resource.RUSAGE_SELF)
+    begin = time.perf_counter()
+    go.set()
+    while True:
+        result.peak_rss_kb = max(result.peak_rss_kb, rss_kb())
+        if time.perf_counter() - begin >= duration:
+            break
+        time.sleep(0.25)
+    stop.set()
+    for t in threads:
+        t.join()
+    result.wall = time.perf_counter() - begin
+    result.cpu = cpu_seconds(resource.RUSAGE_SELF) - cpu
+    return result
+
+
+# ----------------------------
+#   Command Line
+# ----------------------------
+
+def main_loadtest():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=("process", "inprocess"), default="process")
+    parser.add_argument("--ramp", default="1,2,4,8", help="comma-separated session counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per step")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds each player waits between turns")
+    parser.add_argument("--timeout", type=float, default=10.0, help="restart a session silent for this long")
+    parser.add_argument("--script", help="file of commands to replay instead of random input")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", default="loadtest-report.json")
+    args = parser.parse_args()
+    main.load_world()
+
+    if args.script:
+        with open(args.script, "r") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        make_stream = lambda i: ScriptedCommands(lines, offset=i)
+    else:
+        make_stream = lambda i: RandomCommands(random.Random(args.seed * 100003 + i))
+
+    ramp = [int(n) for n in args.ramp.split(",")]
+    workdir = scratch_copy()
+    idle_rss_kb = rss_kb()
+    steps = []
+    print(f"{'sessions':>8} {'turns/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'cpu':>6} {'rss MB':>8} {'MB/sess':>8}")
+    try:
+        for count in ramp:
+            if args.mode == "process":
+                result = run_processes(count, args.duration, make_stream, args.think, args.timeout, workdir)
+            else:
+                result = run_in_process(count, args.duration, make_stream, args.think, workdir, idle_rss_kb)
+            step = result.to_dict()
+            steps.append(step)
+            print(f"{count:>8} {step['throughput_per_s']:>9} {step['latency_p50_ms']!s:>8} "
+                  f"{step['latency_p99_ms']!s:>8} {step['cpu_cores']:>6} {step['peak_rss_mb']:>8} "
+                  f"{step['rss_per_session_mb']:>8}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "mode": args.mode,
+        "duration_s": args.duration,
+        "think_s": args.think,
+        "script": args.script,
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "steps": steps,
+    }
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄  Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main_loadtest()
@@ -1,7 +1,294 @@
+import argparse
+import contextlib
 import random
 import json
+import sys
+import threading
 import time
 
+import analytics
+import events
+import fuzzy
+import hotreload
+import mapview
+import saves
+import snapshots
+
+# ----------------------------
+#   Buffered Output
+# ----------------------------
+
+class OutputBuffer:
+    """
+    Collects everything written during a turn and sends it to the stream
+    in a single write when flushed (before prompting, pausing or exiting).
+    """
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.parts = []
+
+    def write(self, text=""):
+        self.parts.append(text)
+        self.parts.append("\n")
+
+    def flush(self):
+        if not self.parts:
+            return
+        stream = self.stream or sys.stdout
+        stream.write("".join(self.parts))
+        stream.flush()
+        self.parts.clear()
+
+out = OutputBuffer()
+
+# Headless runs (bots, replays, load tests) render nothing and never sleep.
+headless = False
+
+def set_headless(enabled=True):
+    global headless
+    headless = enabled
+
+def ask(prompt):
+    """
+    Flush pending output, then read a line from the player.
+    """
+    if headless:
+        return input()
+    out.flush()
+    return input(prompt)
+
+# --no-delay keeps the console output but skips the dramatic pauses
+delays = True
+
+def set_delays(enabled=True):
+    global delays
+    delays = enabled
+
+# Prompts (the load tester watches for these to know a turn is over)
+COMMAND_PROMPT = "👉  What do you want to do? "
+COMBAT_PROMPT = "🗡️  Do you want to [attack], [defend], or [run]? "
+RIDDLE_PROMPT = "📝  Your answer: "
+
+def pause(seconds):
+    if headless or not delays:
+        return
+    out.flush()
+    time.sleep(seconds)
+
+def end_game():
+    out.flush()
+    exit()
+
+def exit_on_game_end(event):
+    """
+    Sink for headless console runs: renders nothing, but stops the process
+    when the game is over.
+    """
+    if isinstance(event, events.GameEnded):
+        end_game()
+
+# ----------------------------
+#   Console Rendering
+# ----------------------------
+
+COMMANDS_FOOTER = (
+    "=" * 40 + "\n"
+    "🔎  Commands: 'view inventory', 'hint', 'save', 'load', 'use [item]', 'pick up [item]', 'fight', 'open chest', 'map', 'help', 'quit'\n"
+)
+
+HELP_TEXT = """
+📜  Available commands:
+- view inventory        (shows your carried items)
+- hint                  (shows a hint for this room)
+- save [slot]           (save your progress, optionally to a named slot)
+- load [slot]           (load from last save, or from a named slot)
+- saves                 (list your saves)
+- undo                  (take back your last command)
+- use [item]            (use an item from inventory)
+- pick up [item]        (pick up an item in the room)
+- fight                 (engage in combat if available)
+- open chest            (only works in Hidden Chamber if you have a key)
+- map                   (view world map if you have a map)
+- help                  (show this list again)
+- quit                  (exit the game)
+"""
+
+ITEM_FLAVOR = {
+    "light": "💡  The light pushes back the darkness around you.\n",
+    "weapon": "⚔️  You feel ready to face any threats.\n",
+    "armor": "🛡️  You feel protected and confident.\n",
+    "mystical": "🔮  You feel a strange energy course through you.\n",
+    "unlock": "🗝️  Perhaps you can use this to open a door or chest.\n",
+}
+
+class ConsoleRenderer:
+    """
+    Event sink that turns engine events into console text.
+    format_<EventName> methods return the text to write (or None).
+    """
+    def __init__(self, output=None):
+        self.output = output or out
+        self._formatters = {}
+
+    def __call__(self, event):
+        text = self.format(event)
+        if text is not None:
+            self.output.write(text)
+        if isinstance(event, events.GameEnded):
+            end_game()
+
+    def format(self, event):
+        event_type = type(event)
+        formatter = self._formatters.get(event_type)
+        if formatter is None:
+            formatter = getattr(self, "format_" + event_type.__name__, self.format_unknown)
+            self._formatters[event_type] = formatter
+        return formatter(event)
+
+    def format_unknown(self, event):
+        return None
+
+    # --- Session ---
+
+    def format_GameStarted(self, event):
+        return "\n✨  Welcome to the Mini Adventure Game! ✨\nType 'help' at any time to see available commands.\n"
+
+    def format_GameQuit(self, event):
+        return "\n👋  Thanks for playing! Goodbye!\n"
+
+    def format_GameWon(self, event):
+        return "\n🎉  You use the key to unlock the chest and find the legendary treasure.\n\n🎊  Congratulations! You completed your adventure!\n"
+
+    def format_PlayerDied(self, event):
+        if event.cause == "cold":
+            return "\n💀  You have succumbed to the cold. Game over!"
+        return f"💀  You have been defeated by the {event.cause}. Game over!"
+
+    def format_GameSaved(self, event):
+        if event.slot == saves.DEFAULT_SLOT:
+            return "\n💾  Game saved!\n"
+        return f"\n💾  Game saved to slot '{event.slot}'!\n"
+
+    def format_GameLoaded(self, event):
+        if event.slot == saves.DEFAULT_SLOT:
+            return "\n💾  Game loaded!\n"
+        return f"\n💾  Game loaded from slot '{event.slot}'!\n"
+
+    def format_SaveMissing(self, event):
+        if event.slot == saves.DEFAULT_SLOT:
+            return "\n⚠️  No save file found.\n"
+        return f"\n⚠️  No save in slot '{event.slot}'.\n"
+
+    def format_InvalidSaveName(self, event):
+        return f"\n⚠️  '{event.slot}' can't be used as a save slot. Use only letters, digits and _.\n"
+
+    def format_Undone(self, event):
+        return "\n↩️  You retrace your last step.\n"
+
+    def format_NothingToUndo(self, event):
+        return "\n⚠️  There is nothing to undo.\n"
+
+    def format_SavesListed(self, event):
+        if not event.saves:
+            return "\n💾  You have no saves yet.\n"
+        lines = ["\n💾  Your saves:"]
+        for slot, saved_at in event.saves:
+            lines.append(f"  - {slot}  ({time.strftime('%Y-%m-%d %H:%M', time.localtime(saved_at))})")
+        return "\n".join(lines) + "\n"
+
+    # --- Exploration ---
+
+    def format_RoomEntered(self, event):
+        return f"{event.room.render(not event.first_visit)}\n❤️  Your HP: {event.hp}\n{COMMANDS_FOOTER}"
+
+    def format_PlayerMoved(self, event):
+        return f"\n🚶  Moving to {event.destination}...\n"
+
+    def format_UnknownCommand(self, event):
+        return "\n⚠️  I don’t understand that command.\n"
+
+    def format_DidYouMean(self, event):
+        options = " or ".join(f"'{s}'" for s in event.suggestions)
+        return f"\n🤔  Did you mean {options}?\n"
+
+    def format_HintShown(self, event):
+        return f"\n💡  Hint: {event.hint}\n"
+
+    def format_HelpShown(self, event):
+        return HELP_TEXT
+
+    def format_MapShown(self, event):
+        return "\n🗺️  World Map:\n" + event.layout.render(event.location) + "\n"
+
+    def format_MapUnavailable(self, event):
+        return "\n⚠️  You need to pick up a map first.\n"
+
+    def format_RiddleAsked(self, event):
+        return f"\n🧩  A voice whispers: '{event.question}'"
+
+    def format_RiddleAnswered(self, event):
+        if event.correct:
+            return f"✅  Correct! A secret passage to the {event.unlocked} opens.\n"
+        return "❌  That's not the right answer. Try again later.\n"
+
+    def format_ChestLocked(self, event):
+        return "\n🗝️  The chest is locked. You need a key.\n"
+
+    def format_NoChestHere(self, event):
+        return "\n⚠️  There is no chest to open here.\n"
+
+    # --- Items ---
+
+    def format_InventoryShown(self, event):
+        inv = ", ".join(event.items) if event.items else "empty"
+        return f"\n🎒  Your inventory: {inv}\n"
+
+    def format_ItemPicked(self, event):
+        return f"\n✅  You picked up the {event.item}!\n"
+
+    def format_ItemNotHere(self, event):
+        return "\n⚠️  There is no such item here.\n"
+
+    def format_ItemNotCarried(self, event):
+        return "\n⚠️  You don’t have that item in your inventory.\n"
+
+    def format_ItemUnusable(self, event):
+        return "\n⚠️  You can’t use that item right now.\n"
+
+    def format_ItemUsed(self, event):
+        text = f"\n✨  {event.description}\n"
+        if event.item_type == "healing":
+            return text + f"❤️  Your HP is now {event.hp}.\n"
+        return text + ITEM_FLAVOR.get(event.item_type, "❔  You’re not sure what effect this has…\n")
+
+    # --- Combat & Hazards ---
+
+    def format_EnemyAppeared(self, event):
+        return f"\n⚔️  A wild {event.enemy} appears!"
+
+    def format_CombatRound(self, event):
+        if event.action == "attack":
+            text = f"✅  You strike the {event.enemy} for {event.damage} damage!\n"
+            if event.enemy_hp > 0:
+                return text + f"   {event.enemy} HP is now {event.enemy_hp}.\n"
+            return text + f"   {event.enemy} is defeated!\n"
+        if event.action == "defend":
+            return f"🛡️  You brace for the {event.enemy}’s next attack, reducing incoming damage this round."
+        if event.escaped:
+            return "🏃  You managed to flee safely!\n"
+        return "⚠️  You couldn't escape!\n"
+
+    def format_InvalidAction(self, event):
+        return "⚠️  Invalid action. Please choose [attack], [defend], or [run].\n"
+
+    def format_EnemyDefeated(self, event):
+        return f"🎉  You have slain the {event.enemy}!\n"
+
+    def format_DamageTaken(self, event):
+        if event.source == "cold":
+            return f"\n🌬️  A sudden gust of wind chills you to the bone!\n❤️  Your HP is now {event.hp}."
+        return f"⚠️  The {event.source} hits you for {event.amount} damage!\n   Your HP is now {event.hp}.\n"
+
 # ----------------------------
 #   Class Definitions
 # ----------------------------
@@ -12,40 +299,176 @@ class Enemy:
         self.hp = hp
         self.attack = attack
 
-class Room:
+class RoomTemplate:
+    """
+    The static part of a room: description, hints and the starting items and
+    connections. Built once per world and shared by every session's Room;
+    never modified (hot reload swaps in a new template instead).
+    """
+    __slots__ = ("name", "description", "hints", "items", "connections")
+
     def __init__(self, name, data):
         self.name = name
         self.description = data["description"]
-        self.items = data.get("items", []).copy()
-        self.connections = data.get("connections", []).copy()
         self.hints = data.get("hints", "")
-        self.visited = False   # Track if this room has been visited before
+        self.items = tuple(data.get("items", []))
+        self.connections = tuple(data.get("connections", []))
+
+    def replace(self, **changes):
+        """
+        Return a copy of this template with some fields changed.
+        """
+        data = {
+            "description": self.description,
+            "hints": self.hints,
+            "items": self.items,
+            "connections": self.connections,
+        }
+        data.update(changes)
+        return RoomTemplate(self.name, data)
+
+
+class Room:
+    """
+    One session's view of a room: a shared RoomTemplate plus the changes this
+    session made. Items and connections are read from the template until the
+    session first changes them; from then on the room keeps its own tuple.
+    """
+    __slots__ = ("template", "_items", "_connections", "_visited", "_render_cache", "journal")
+
+    def __init__(self, name, data):
+        # `data` is a shared RoomTemplate, or a rooms.json-style dict for a private one
+        self.template = data if isinstance(data, RoomTemplate) else RoomTemplate(name, data)
+        self._items = None         # overlay, created on first change
+        self._connections = None   # overlay, created on first change
+        self._visited = False   # Track if this room has been visited before
+        self._render_cache = None   # visited flag -> rendered header/items/paths
+        self.journal = None    # set of changed room names, kept by a snapshots.Snapshotter
+
+    @property
+    def name(self):
+        return self.template.name
+
+    @property
+    def description(self):
+        return self.template.description
+
+    @property
+    def hints(self):
+        return self.template.hints
+
+    @property
+    def items(self):
+        return self.template.items if self._items is None else self._items
+
+    @property
+    def connections(self):
+        return self.template.connections if self._connections is None else self._connections
+
+    @property
+    def visited(self):
+        return self._visited
+
+    @visited.setter
+    def visited(self, value):
+        if value != self._visited:
+            self._visited = value
+            if self.journal is not None:
+                self.journal.add(self.template.name)
+
+    def _changed(self):
+        self._render_cache = None
+        if self.journal is not None:
+            self.journal.add(self.template.name)
 
     def remove_item(self, item_name):
         if item_name in self.items:
-            self.items.remove(item_name)
+            items = list(self.items)
+            items.remove(item_name)
+            self._items = tuple(items)
+            self._changed()
 
     def add_connection(self, new_room_name):
         if new_room_name not in self.connections:
-            self.connections.append(new_room_name)
+            self._connections = self.connections + (new_room_name,)
+            self._changed()
+
+    def remove_connection(self, room_name):
+        if room_name in self.connections:
+            self._connections = tuple(c for c in self.connections if c != room_name)
+            self._changed()
+
+    def set_template(self, template, connections_added=(), connections_removed=()):
+        """
+        Switch to a new template (content reload). If this session already
+        has its own connections, the same additions/removals are applied to them.
+        """
+        self.template = template
+        if self._connections is not None:
+            for target in connections_added:
+                self.add_connection(target)
+            for target in connections_removed:
+                self.remove_connection(target)
+        self._changed()
+
+    def render(self, visited=None):
+        """
+        Return the room's header, items and paths as one block of text, with
+        the short header if `visited` (default: the room's own flag).
+        Cached per visited state; cleared whenever items or connections change.
+        """
+        if visited is None:
+            visited = self.visited
+        if self._render_cache is None:
+            self._render_cache = {}
+        text = self._render_cache.get(visited)
+        if text is None:
+            if not visited:
+                header = f"📍  Location: {self.name}\n📝  {self.description}"
+            else:
+                header = f"📍  You return to: {self.name}"
+            text = (
+                "\n" + "=" * 40 + "\n" + header + "\n"
+                f"👜  You see: {', '.join(self.items) if self.items else 'Nothing here.'}\n"
+                f"➡️  Paths: {', '.join(self.connections)}"
+            )
+            self._render_cache[visited] = text
+        return text
+
+    def state(self):
+        """
+        Everything this session changed, as an immutable tuple (for snapshots).
+        The template is not part of it: restoring an old state keeps the
+        current (possibly hot-reloaded) template.
+        """
+        return (self._items, self._connections, self._visited)
+
+    def set_state(self, state):
+        self._items, self._connections, visited = state
+        self.visited = visited
+        self._changed()
 
     def to_dict(self):
         """
         Serialize dynamic fields for saving.
         """
         return {
-            "items": self.items,
-            "connections": self.connections,
+            "items": list(self.items),
+            "connections": list(self.connections),
             "visited": self.visited
         }
 
     def load_dynamic(self, data):
         """
         Restore dynamic fields (items, connections, visited) from saved data.
+        Fields that match the template don't get an overlay.
         """
-        self.items = data.get("items", []).copy()
-        self.connections = data.get("connections", []).copy()
+        items = tuple(data.get("items", []))
+        connections = tuple(data.get("connections", []))
+        self._items = None if items == self.template.items else items
+        self._connections = None if connections == self.template.connections else connections
         self.visited = data.get("visited", False)
+        self._changed()
 
 
 class Player:
@@ -60,54 +483,32 @@ class Player:
     def pick_up(self, item_name):
         self.inventory.append(item_name)
 
-    def use_item(self, item_name, items_data):
+    def use_item(self, bus, item_name, items_data):
         """
         Use an item from inventory. Now reads:
           - "heal_amount" for healing items
           - "type": "light"/"weapon"/"armor"/"mystical"/"unlock"/etc.
+        Only healing items have an effect here; weapons and armor are passive.
         """
         if item_name not in self.inventory:
-            print("\n⚠️  You don’t have that item in your inventory.\n")
+            bus.emit(events.ItemNotCarried(item_name))
             return
 
         item = items_data.get(item_name)
         if not item:
-            print("\n⚠️  You can’t use that item right now.\n")
+            bus.emit(events.ItemUnusable(item_name))
             return
 
         item_type = item.get("type")
         description = item.get("description", "You use the item.")
 
-        print(f"\n✨  {description}")
-
         # Healing logic now uses "heal_amount"
         if item_type == "healing":
             heal_amt = item.get("heal_amount", 0)
             self.hp += heal_amt
             self.inventory.remove(item_name)
-            print(f"❤️  Your HP is now {self.hp}.\n")
 
-        elif item_type == "light":
-            # You could check "usable_in" here, but for now just print description
-            print("💡  The light pushes back the darkness around you.\n")
-
-        elif item_type == "weapon":
-            # Already handled in combat; here just a flavor message
-            print("⚔️  You feel ready to face any threats.\n")
-
-        elif item_type == "armor":
-            # Armor use is passive; here just a flavor message
-            print("🛡️  You feel protected and confident.\n")
-
-        elif item_type == "mystical":
-            print("🔮  You feel a strange energy course through you.\n")
-
-        elif item_type == "unlock":
-            # Key or similar; maybe contextual logic elsewhere
-            print("🗝️  Perhaps you can use this to open a door or chest.\n")
-
-        else:
-            print("❔  You’re not sure what effect this has…\n")
+        bus.emit(events.ItemUsed(item_name, item_type, description, self.hp))
 
     def attack_power(self, items_data):
         """
@@ -147,88 +548,202 @@ def load_items(filename):
     with open(filename, "r") as f:
         return json.load(f)
 
-# 1. Load raw JSON data:
-raw_rooms_data = load_rooms_raw("rooms.json")
-items_data = load_items("items.json")
+# The world. Nothing is read from disk until load_world() runs; it fills
+# these in place, so modules that did `from main import rooms` see the data.
+raw_rooms_data = {}
+items_data = {}
+new_rooms_data = {}
+room_templates = {}     # static room data, shared by every session
+rooms = {}              # the default session's rooms
+world_loaded = False
+_world_lock = threading.Lock()
 
-# 2. Extract all items into a single pool (preserve counts per room):
-room_item_counts = { name: len(data.get("items", [])) for name, data in raw_rooms_data.items() }
-all_items = []
-for data in raw_rooms_data.values():
-    all_items.extend(data.get("items", []))
+def shuffle_items(raw_rooms):
+    """
+    Copy of the room data with all items shuffled between rooms
+    (each room keeps its number of items).
+    """
+    # 1. Extract all items into a single pool (preserve counts per room):
+    room_item_counts = { name: len(data.get("items", [])) for name, data in raw_rooms.items() }
+    all_items = []
+    for data in raw_rooms.values():
+        all_items.extend(data.get("items", []))
+
+    # 2. Shuffle the pool:
+    random.shuffle(all_items)
+
+    # 3. Re-assign items back to each room based on original counts:
+    shuffled = {}
+    idx = 0
+    for room_name, data in raw_rooms.items():
+        count = room_item_counts[room_name]
+        assigned = all_items[idx : idx + count]
+        idx += count
+
+        shuffled[room_name] = {
+            "description": data["description"],
+            "items": assigned,
+            "connections": data["connections"],
+            "hints": data.get("hints", "")
+        }
+    return shuffled
 
-# 3. Shuffle the pool:
-random.shuffle(all_items)
+def load_world(rooms_file="rooms.json", items_file="items.json", progress=None):
+    """
+    Load and shuffle the world and build the default session's rooms; does
+    nothing if it is already loaded. `progress(fraction, message)` is called
+    along the way, from whichever thread is loading.
+    """
+    global world_loaded
+    report = progress or (lambda fraction, message: None)
+    with _world_lock:
+        if world_loaded:
+            return
+        report(0.0, "Reading rooms")
+        raw_rooms_data.update(load_rooms_raw(rooms_file))
+        report(0.2, "Reading items")
+        items_data.update(load_items(items_file))
+        report(0.3, "Shuffling items")
+        new_rooms_data.update(shuffle_items(raw_rooms_data))
+
+        report(0.4, "Building rooms")
+        total = len(new_rooms_data)
+        for i, (name, info) in enumerate(new_rooms_data.items(), 1):
+            room_templates[name] = RoomTemplate(name, info)
+            if i % 500 == 0:
+                report(0.4 + 0.4 * i / total, "Building rooms")
+        rooms.update(new_session_rooms())
+
+        report(0.9, "Indexing names")
+        names = set(items_data)
+        names.update(name.lower() for name in rooms)
+        # Rooms may hold items that items.json doesn't describe
+        names.update(item for data in raw_rooms_data.values() for item in data.get("items", []))
+        for name in names:
+            name_index.add(name)
+        world_loaded = True
+        report(1.0, "Ready")
+
+def new_session_rooms():
+    """
+    A fresh set of Room objects for one session, all sharing room_templates.
+    """
+    return { name: Room(name, template) for name, template in room_templates.items() }
 
-# 4. Re-assign items back to each room based on original counts:
-new_rooms_data = {}
-idx = 0
-for room_name, data in raw_rooms_data.items():
-    count = room_item_counts[room_name]
-    assigned = all_items[idx : idx + count]
-    idx += count
-
-    new_room_entry = {
-        "description": data["description"],
-        "items": assigned,
-        "connections": data["connections"],
-        "hints": data.get("hints", "")
-    }
-    new_rooms_data[room_name] = new_room_entry
+# ----------------------------
+#   Typo-Tolerant Matching
+# ----------------------------
+
+FUZZY_MAX_DISTANCE = 2   # largest edit distance still offered as "did you mean" (0 disables)
 
-# Convert to Room objects
-rooms = { name: Room(name, info) for name, info in new_rooms_data.items() }
+COMMAND_PHRASES = ["view inventory", "hint", "save", "load", "saves", "undo", "fight", "open chest", "map", "help", "quit"]
+ITEM_VERBS = ["use", "pick up"]
+
+# Every name a command can refer to; load_world() adds the world's rooms and
+# items, and names seen later are added as they come up
+name_index = fuzzy.NameIndex(COMMAND_PHRASES + ITEM_VERBS)
+
+def closest_names(word, candidates):
+    """
+    Return the names in `candidates` closest to a mistyped `word` (all ties), or [].
+    Short words get a smaller allowance so they don't match everything.
+    """
+    max_distance = min(FUZZY_MAX_DISTANCE, max(1, len(word) // 3))
+    matches = name_index.search(word, max_distance, candidates)
+    if not matches:
+        return []
+    best = matches[0][0]
+    return [name for d, name in matches if d == best]
+
+def suggest_command(player, rooms, cmd):
+    """
+    Guess what an unrecognised command meant, e.g. 'pick up potoin' -> ['pick up potion'].
+    Only names in scope are considered: the room's items, the inventory, the exits.
+    """
+    current = rooms[player.location]
+    inventory = set(player.inventory)
+    room_items = set(current.items)
+
+    if cmd.startswith("use "):
+        return [f"use {n}" for n in closest_names(cmd[4:].strip(), inventory)]
+    if cmd.startswith("pick up "):
+        return [f"pick up {n}" for n in closest_names(cmd[8:].strip(), room_items)]
+
+    exits = {name.lower(): name for name in current.connections}
+    suggestions = closest_names(cmd, set(COMMAND_PHRASES))
+    suggestions += [exits[n] for n in closest_names(cmd, set(exits))]
+    if suggestions:
+        return suggestions
+
+    # Misspelled verb: 'uze potion', 'pik up key'
+    words = cmd.split()
+    for verb, scope in (("use", inventory), ("pick up", room_items)):
+        size = len(verb.split())
+        if len(words) > size and closest_names(" ".join(words[:size]), {verb}):
+            item = " ".join(words[size:])
+            names = [item] if item in scope else closest_names(item, scope)
+            if names:
+                return [f"{verb} {n}" for n in names]
+    return []
 
 
 # ----------------------------
 #   Game Functions
 # ----------------------------
 
-def show_room(player, rooms):
+def show_room(bus, player, rooms, visited=None):
     """
     Display information about the player's current room.
     If the room was visited before, show a shorter message.
+    `visited` is the player's own set of visited room names in a shared
+    world, where the rooms (and their visited flags) belong to everyone.
     """
     current = rooms[player.location]
+    if visited is None:
+        first_visit = not current.visited
+    else:
+        first_visit = current.name not in visited
 
-    print("\n" + "=" * 40)
-    if not current.visited:
-        # First-time visit: full description
-        print(f"📍  Location: {current.name}")
-        print(f"📝  {current.description}")
+    # Renderers need the pre-visit state to pick the full or short header
+    bus.emit(events.RoomEntered(current, first_visit, player.hp))
+    if visited is None:
         current.visited = True
     else:
-        # Subsequent visits: shorter reminder
-        print(f"📍  You return to: {current.name}")
+        visited.add(current.name)
 
-    # Always show items and connections
-    print(f"👜  You see: {', '.join(current.items) if current.items else 'Nothing here.'}")
-    print(f"➡️  Paths: {', '.join(current.connections)}")
-    print(f"❤️  Your HP: {player.hp}")
-    print("=" * 40)
-    print("🔎  Commands: 'view inventory', 'hint', 'save', 'load', 'use [item]', 'pick up [item]', 'fight', 'open chest', 'map', 'help', 'quit'")
-    print()
-
-def random_event(player):
+def random_event(bus, player, rng=random):
     """
     Occasional random event that reduces HP by 1 (20% chance each turn).
+    `rng` is the session's random.Random.
     """
-    if random.randint(1, 5) == 1:
-        print("\n🌬️  A sudden gust of wind chills you to the bone!")
+    if rng.randint(1, 5) == 1:
         player.hp -= 1
-        print(f"❤️  Your HP is now {player.hp}.")
+        bus.emit(events.DamageTaken("cold", 1, player.hp))
         if player.hp <= 0:
-            print("\n💀  You have succumbed to the cold. Game over!")
-            exit()
-        time.sleep(1)
+            bus.emit(events.PlayerDied("cold"))
+            return
+        pause(1)
+
+# Where saves go and whose they are; main.py's command line can switch to SQLite
+save_backend = saves.JsonFileBackend()
+save_player_id = saves.DEFAULT_PLAYER
 
-def save_game(player, rooms):
+def default_slots():
     """
-    Save player state and dynamic room state (items, connections, visited) to a JSON file.
+    The save slots of the player named on the command line (saves.SaveSlots).
+    """
+    return saves.SaveSlots(save_backend, save_player_id)
+
+# Gameplay analytics (analytics.Analytics), enabled with --analytics
+stats = None
+
+def game_state(player, rooms):
+    """
+    Player state and dynamic room state (items, connections, visited) as a JSON-able dict.
     """
     rooms_dynamic = { name: room.to_dict() for name, room in rooms.items() }
 
-    data = {
+    return {
         "player": {
             "location": player.location,
             "inventory": player.inventory,
@@ -236,55 +751,131 @@ def save_game(player, rooms):
         },
         "rooms": rooms_dynamic
     }
-    with open("savegame.json", "w") as f:
-        json.dump(data, f)
-    print("\n💾  Game saved!\n")
 
-def load_game(player, rooms):
+def restore_state(player, rooms, data):
+    # Restore player state
+    player.location = data["player"]["location"]
+    player.inventory.clear()
+    player.inventory.extend(data["player"]["inventory"])
+    player.hp = data["player"]["hp"]
+
+    # Restore each room’s items, connections, and visited
+    for name, ro_data in data["rooms"].items():
+        if name in rooms:
+            rooms[name].load_dynamic(ro_data)
+
+def save_game(bus, player, rooms, slot=saves.DEFAULT_SLOT, slots=None):
     """
-    Load player state and room dynamic state from savegame.json.
+    Save player state and dynamic room state to the player's save slots
+    (a saves.SaveSlots; default_slots() if not given).
     """
-    try:
-        with open("savegame.json", "r") as f:
-            data = json.load(f)
+    if not saves.valid_name(slot):
+        bus.emit(events.InvalidSaveName(slot))
+        return
+    (slots or default_slots()).save(slot, game_state(player, rooms))
+    bus.emit(events.GameSaved(slot))
 
-            # Restore player state
-            player.location = data["player"]["location"]
-            player.inventory.clear()
-            player.inventory.extend(data["player"]["inventory"])
-            player.hp = data["player"]["hp"]
+def load_game(bus, player, rooms, slot=saves.DEFAULT_SLOT, slots=None):
+    """
+    Load player state and room dynamic state from the player's save slots.
+    """
+    if not saves.valid_name(slot):
+        bus.emit(events.InvalidSaveName(slot))
+        return
+    data = (slots or default_slots()).load(slot)
+    if data is None:
+        bus.emit(events.SaveMissing(slot))
+        return
+    restore_state(player, rooms, data)
+    bus.emit(events.GameLoaded(slot))
+
+def list_saves(bus, slots=None):
+    bus.emit(events.SavesListed((slots or default_slots()).list_saves()))
+
+class PrivateWorld:
+    """
+    What the handlers need from the world they run in: a lock per room and
+    the enemy to fight there. A private (single-player) world locks nothing
+    and every fight is against a fresh Goblin; world.SharedWorld shares one
+    set of rooms between many players and locks each room separately.
+    """
+    def lock_for(self, room_name):
+        return contextlib.nullcontext()
+
+    def enemy_in(self, room_name):
+        return Enemy(name="Goblin", hp=GOBLIN_HP, attack=GOBLIN_ATTACK)
 
-            # Restore each room’s items, connections, and visited
-            for name, ro_data in data["rooms"].items():
-                if name in rooms:
-                    rooms[name].load_dynamic(ro_data)
+    def enemy_defeated(self, room_name, enemy):
+        # Caller holds the room's lock
+        pass
 
-            print("\n💾  Game loaded!\n")
-    except FileNotFoundError:
-        print("\n⚠️  No save file found.\n")
+private_world = PrivateWorld()
 
-def handle_pickup(player, rooms, item_name):
+def handle_pickup(bus, player, rooms, item_name, world=private_world):
     """
     Player picks up an item from the current room if it exists there.
     """
     current = rooms[player.location]
-    if item_name in current.items:
+    with world.lock_for(player.location):
+        picked = item_name in current.items
+        if picked:
+            current.remove_item(item_name)
+    if picked:
         player.pick_up(item_name)
-        current.remove_item(item_name)
-        print(f"\n✅  You picked up the {item_name}!\n")
+        bus.emit(events.ItemPicked(item_name))
     else:
-        print("\n⚠️  There is no such item here.\n")
+        bus.emit(events.ItemNotHere(item_name))
 
-def handle_combat(player):
+def handle_move(bus, player, rooms, destination, world=private_world):
+    """
+    Move along one of the current room's connections (case-insensitive).
+    Returns False if there is no such path.
+    """
+    with world.lock_for(player.location):
+        connections = rooms[player.location].connections
+    for room_name in connections:
+        if room_name.lower() == destination:
+            bus.emit(events.PlayerMoved(room_name))
+            player.move_to(room_name)
+            return True
+    return False
+
+GOBLIN_HP = 5
+GOBLIN_ATTACK = 1
+RUN_CHANCE = 0.5          # chance that [run] gets the player away
+DEFEND_REDUCTION = 1      # damage blocked by [defend], on top of armor
+
+def enemy_damage(enemy_attack, defending, player_defense):
+    """
+    Damage an enemy's hit does after defending and armor are applied.
+    """
+    dmg = enemy_attack
+    if defending:
+        dmg = max(dmg - DEFEND_REDUCTION, 0)
+    return max(dmg - player_defense, 0)
+
+RIDDLE_ROOM = "Cave"
+RIDDLE_ITEM = "torch"              # the riddle is only asked while this is still in the room
+RIDDLE_TARGET = "Hidden Chamber"
+RIDDLE_QUESTION = "I speak without a mouth and hear without ears. What am I?"
+RIDDLE_ANSWER = "echo"
+
+CHEST_ROOM = "Hidden Chamber"      # opening the chest here with the key wins the game
+CHEST_KEY = "key"
+
+def handle_combat(bus, player, ask=ask, rng=random, world=private_world):
     """
     Turn-based combat system. The player may have weapons/armor that affect attack/defense.
     A small Goblin enemy appears with defined stats.
+    `ask` returns the player's choice; None cancels the fight (GUI dialog closed).
+    `rng` (the session's random.Random) decides whether running away works.
+    In a shared world everyone in the room fights the same Goblin.
     """
-    # Instantiate a basic enemy (Goblin)
-    goblin = Enemy(name="Goblin", hp=5, attack=1)
+    room_name = player.location
+    goblin = world.enemy_in(room_name)
 
-    print("\n⚔️  A wild Goblin appears!")
-    time.sleep(1)
+    bus.emit(events.EnemyAppeared(goblin.name, goblin.hp, goblin.attack))
+    pause(1)
 
     # Determine player's base attack and defense from inventory
     player_attack = player.attack_power(items_data)
@@ -292,172 +883,189 @@ def handle_combat(player):
 
     while player.hp > 0 and goblin.hp > 0:
         # Player’s choice
-        choice = input("🗡️  Do you want to [attack], [defend], or [run]? ").strip().lower()
+        choice = ask(COMBAT_PROMPT)
+        if choice is None:
+            bus.emit(events.CombatCancelled(goblin.name))
+            return
+        choice = choice.strip().lower()
+        if choice not in ("attack", "defend", "run"):
+            bus.emit(events.InvalidAction(choice))
+            continue  # Skip Goblin’s turn, prompt player again
 
-        if choice == "attack":
-            # Player deals damage to Goblin
-            goblin.hp -= player_attack
-            print(f"✅  You strike the {goblin.name} for {player_attack} damage!")
-            if goblin.hp > 0:
-                print(f"   {goblin.name} HP is now {goblin.hp}.\n")
-            else:
-                print(f"   {goblin.name} is defeated!\n")
+        escaped = choice == "run" and rng.random() < RUN_CHANCE
+        dmg = 0
+        with world.lock_for(room_name):
+            if goblin.hp <= 0:
+                break  # Someone else in the room finished it off
+            if choice == "attack":
+                # Player deals damage to Goblin
+                goblin.hp -= player_attack
+            enemy_hp = goblin.hp
+            if enemy_hp <= 0:
+                world.enemy_defeated(room_name, goblin)
+            elif not escaped:
+                # Goblin’s turn: defending reduces damage by 1, armor reduces it further
+                dmg = enemy_damage(goblin.attack, choice == "defend", player_defense)
 
+        if choice == "attack":
+            bus.emit(events.CombatRound(goblin.name, "attack", player_attack, enemy_hp))
         elif choice == "defend":
-            print("🛡️  You brace for the Goblin’s next attack, reducing incoming damage this round.")
-            defending = True
-
-        elif choice == "run":
-            chance = random.random()
-            if chance < 0.5:
-                print("🏃  You managed to flee safely!\n")
-                return
-            else:
-                print("⚠️  You couldn't escape!\n")
-                defending = False
-
+            bus.emit(events.CombatRound(goblin.name, "defend", enemy_hp=enemy_hp))
         else:
-            print("⚠️  Invalid action. Please choose [attack], [defend], or [run].\n")
-            continue  # Skip Goblin’s turn, prompt player again
+            bus.emit(events.CombatRound(goblin.name, "run", enemy_hp=enemy_hp, escaped=escaped))
+            if escaped:
+                return
 
         # Goblin’s turn (only if still alive)
-        if goblin.hp > 0:
-            dmg = goblin.attack
-            if choice == "defend":
-                dmg = max(dmg - 1, 0)     # Defending reduces damage by 1
-            dmg = max(dmg - player_defense, 0)  # Armor reduces damage further
-
+        if enemy_hp > 0:
             player.hp -= dmg
-            print(f"⚠️  The {goblin.name} hits you for {dmg} damage!")
-            print(f"   Your HP is now {player.hp}.\n")
+            bus.emit(events.DamageTaken(goblin.name, dmg, player.hp))
 
             if player.hp <= 0:
-                print("💀  You have been defeated by the Goblin. Game over!")
-                exit()
+                bus.emit(events.PlayerDied(goblin.name))
+                return
 
-        time.sleep(1)
+        pause(1)
 
     # If loop exits because goblin.hp <= 0
-    print("🎉  You have slain the Goblin!\n")
+    bus.emit(events.EnemyDefeated(goblin.name))
 
-def handle_riddle(player, rooms):
+def handle_riddle(bus, player, rooms, ask=ask, world=private_world):
     """
     If the player is in the Cave and the torch is still in the room,
     present the riddle. Correct answer unlocks Hidden Chamber.
     """
-    if player.location == "Cave":
-        current = rooms["Cave"]
-        if "torch" in current.items:  # Riddle only if torch still there
-            print("\n🧩  A voice whispers: 'I speak without a mouth and hear without ears. What am I?'")
-            answer = input("📝  Your answer: ").lower()
-            if answer == "echo":
-                print("✅  Correct! A secret passage to the Hidden Chamber opens.\n")
-                current.add_connection("Hidden Chamber")
+    if player.location == RIDDLE_ROOM:
+        current = rooms[RIDDLE_ROOM]
+        if RIDDLE_ITEM in current.items:  # Riddle only if torch still there
+            bus.emit(events.RiddleAsked(RIDDLE_ROOM, RIDDLE_QUESTION))
+            answer = (ask(RIDDLE_PROMPT) or "").lower()
+            if answer == RIDDLE_ANSWER:
+                with world.lock_for(RIDDLE_ROOM):
+                    current.add_connection(RIDDLE_TARGET)
+                bus.emit(events.RiddleAnswered(RIDDLE_ROOM, True, RIDDLE_TARGET))
             else:
-                print("❌  That's not the right answer. Try again later.\n")
+                bus.emit(events.RiddleAnswered(RIDDLE_ROOM, False))
 
-def show_map(rooms, player):
+def show_map(bus, rooms, player, layout=None):
     """
-    If the player has a map in inventory, display all rooms and their connections.
+    If the player has a map in inventory, display the rooms visited so far.
+    `layout` is the session's mapview.MapLayout; without one the map is laid
+    out from scratch.
     """
     if "map" in player.inventory:
-        print("\n🗺️  World Map:")
-        for room_obj in rooms.values():
-            print(f"  - {room_obj.name} → {', '.join(room_obj.connections)}")
-        print()
+        if layout is None:
+            layout = mapview.MapLayout(rooms)
+            layout.sync()
+        bus.emit(events.MapShown(rooms, layout, player.location))
     else:
-        print("\n⚠️  You need to pick up a map first.\n")
+        bus.emit(events.MapUnavailable())
 
-def show_help():
+def show_help(bus):
     """
     Display a list of available commands.
     """
-    print("\n📜  Available commands:")
-    print("- view inventory        (shows your carried items)")
-    print("- hint                  (shows a hint for this room)")
-    print("- save                  (save your progress)")
-    print("- load                  (load from last save)")
-    print("- use [item]            (use an item from inventory)")
-    print("- pick up [item]        (pick up an item in the room)")
-    print("- fight                 (engage in combat if available)")
-    print("- open chest            (only works in Hidden Chamber if you have a key)")
-    print("- map                   (view world map if you have a map)")
-    print("- help                  (show this list again)")
-    print("- quit                  (exit the game)\n")
-
-def handle_open_chest(player, rooms):
+    bus.emit(events.HelpShown())
+
+def show_hint(bus, player, rooms):
+    bus.emit(events.HintShown(player.location, rooms[player.location].hints))
+
+def handle_open_chest(bus, player, rooms):
     """
     If the player is in Hidden Chamber and has a key, they win.
     """
-    if player.location == "Hidden Chamber":
-        if "key" in player.inventory:
-            print("\n🎉  You use the key to unlock the chest and find the legendary treasure.")
-            print("\n🎊  Congratulations! You completed your adventure!\n")
-            exit()
+    if player.location == CHEST_ROOM:
+        if CHEST_KEY in player.inventory:
+            bus.emit(events.GameWon(player.location))
         else:
-            print("\n🗝️  The chest is locked. You need a key.\n")
+            bus.emit(events.ChestLocked())
     else:
-        print("\n⚠️  There is no chest to open here.\n")
+        bus.emit(events.NoChestHere())
 
-def handle_command(player, rooms, items_data, command):
+def handle_command(bus, player, rooms, items_data, command, ask=ask, history=None, layout=None,
+                   rng=random, world=private_world, slots=None):
     """
-    Parse and execute the player's command.
+    Parse and execute the player's command; events go to the session's `bus`.
+    `history` (a snapshots.UndoHistory) enables 'undo', which takes back the
+    last command that changed the game. `layout` is the session's map (see show_map)
+    and `rng` its random.Random. `world` is the PrivateWorld (or shared
+    world.SharedWorld) the rooms belong to, and `slots` the player's
+    saves.SaveSlots (see save_game).
     """
     cmd = command.strip().lower()
+    bus.emit(events.CommandIssued(cmd, player.location))
+
+    if cmd == "undo" and history is not None:
+        bus.emit(events.Undone() if history.undo() else events.NothingToUndo())
+        return
+    if history is not None:
+        history.checkpoint()
 
     if cmd == "quit":
-        print("\n👋  Thanks for playing! Goodbye!\n")
-        exit()
+        bus.emit(events.GameQuit())
 
     elif cmd == "view inventory":
-        inv = ", ".join(player.inventory) if player.inventory else "empty"
-        print(f"\n🎒  Your inventory: {inv}\n")
+        bus.emit(events.InventoryShown(list(player.inventory)))
 
     elif cmd == "save":
-        save_game(player, rooms)
+        save_game(bus, player, rooms, slots=slots)
+
+    elif cmd.startswith("save "):
+        save_game(bus, player, rooms, cmd[5:].strip(), slots)
 
     elif cmd == "load":
-        load_game(player, rooms)
+        load_game(bus, player, rooms, slots=slots)
+
+    elif cmd.startswith("load "):
+        load_game(bus, player, rooms, cmd[5:].strip(), slots)
+
+    elif cmd == "saves":
+        list_saves(bus, slots)
 
     elif cmd == "hint":
-        hint_text = rooms[player.location].hints
-        print(f"\n💡  Hint: {hint_text}\n")
+        show_hint(bus, player, rooms)
 
     elif cmd.startswith("use "):
         item_name = cmd[4:].strip()
-        player.use_item(item_name, items_data)
+        suggestions = [] if item_name in player.inventory else suggest_command(player, rooms, cmd)
+        if suggestions:
+            bus.emit(events.DidYouMean(cmd, suggestions))
+        else:
+            player.use_item(bus, item_name, items_data)
 
     elif cmd.startswith("pick up "):
         item_name = cmd[8:].strip()
-        handle_pickup(player, rooms, item_name)
+        suggestions = [] if item_name in rooms[player.location].items else suggest_command(player, rooms, cmd)
+        if suggestions:
+            bus.emit(events.DidYouMean(cmd, suggestions))
+        else:
+            handle_pickup(bus, player, rooms, item_name, world)
 
     elif cmd == "fight":
-        handle_combat(player)
+        handle_combat(bus, player, ask, rng, world)
 
     elif cmd == "open chest":
-        handle_open_chest(player, rooms)
+        handle_open_chest(bus, player, rooms)
 
     elif cmd == "map":
-        show_map(rooms, player)
+        show_map(bus, rooms, player, layout)
 
     elif cmd == "help":
-        show_help()
-
-    else:
-        # Attempt to move to a connected room
-        current_room = rooms[player.location]
-        if cmd in [r.lower() for r in current_room.connections]:
-            for room_name in current_room.connections:
-                if room_name.lower() == cmd:
-                    print(f"\n🚶  Moving to {room_name}...\n")
-                    player.move_to(room_name)
-                    break
+        show_help(bus)
+
+    # Anything else is a move to a connected room, or a typo
+    elif not handle_move(bus, player, rooms, cmd, world):
+        suggestions = suggest_command(player, rooms, cmd)
+        if suggestions:
+            bus.emit(events.DidYouMean(cmd, suggestions))
+        # If in Cave, always check riddle prompt on any invalid input
+        elif player.location == RIDDLE_ROOM:
+            handle_riddle(bus, player, rooms, ask, world)
         else:
-            # If in Cave, always check riddle prompt on any invalid input
-            if player.location == "Cave":
-                handle_riddle(player, rooms)
-            else:
-                print("\n⚠️  I don’t understand that command.\n")
+            bus.emit(events.UnknownCommand(cmd))
+
+    if history is not None:
+        history.commit()
 
 
 # ----------------------------
@@ -465,19 +1073,67 @@ def handle_command(player, rooms, items_data, command):
 # ----------------------------
 
 def main_game_loop():
-    # Initialize player
+    load_world()
+
+    bus = events.EventBus()
+    # Subscribed first so it sees GameEnded before the renderer exits
+    if stats is not None:
+        bus.subscribe(stats.session())
+    # Headless runs only need to know when to stop; otherwise render to the console
+    bus.subscribe(exit_on_game_end if headless else ConsoleRenderer())
+
+    # Initialize player; the session's own RNG drives its random events and fights
     player = Player(start_location="Forest Entrance", hp=10)
-    print("\n✨  Welcome to the Mini Adventure Game! ✨")
-    print("Type 'help' at any time to see available commands.\n")
-    time.sleep(1)
+    rng = random.Random()
+    bus.emit(events.GameStarted())
+    pause(1)
+
+    # Pick up edits to rooms.json / items.json without restarting
+    watcher = hotreload.ContentWatcher(
+        raw_rooms_data, items_data, room_templates, RoomTemplate, Room, on_new_name=name_index.add
+    )
+    watcher.register(rooms, [player])
+
+    history = snapshots.UndoHistory(snapshots.Snapshotter(player, rooms))
+
+    # Lays out rooms as they are discovered, for the map command
+    layout = mapview.MapLayout(rooms)
+    bus.subscribe(layout)
 
     while True:
-        show_room(player, rooms)
-        random_event(player)
-        command = input("👉  What do you want to do? ")
-        handle_command(player, rooms, items_data, command)
-        time.sleep(0.5)
+        watcher.check()
+        show_room(bus, player, rooms)
+        random_event(bus, player, rng)
+        command = ask(COMMAND_PROMPT)
+        handle_command(bus, player, rooms, items_data, command, history=history, layout=layout, rng=rng)
+        pause(0.5)
+
+
+def parse_args(argv):
+    """
+    --headless, --save-db PATH (SQLite saves instead of savegame.json), --player NAME,
+    --analytics PATH (aggregate gameplay stats into a JSON file), --no-delay.
+    """
+    global save_backend, save_player_id, stats
+    parser = argparse.ArgumentParser(description="Play the text adventure in the console.")
+    parser.add_argument("--headless", action="store_true", help="plain prompts for scripted players")
+    parser.add_argument("--no-delay", action="store_true", help="skip the pauses between messages")
+    parser.add_argument("--save-db", metavar="PATH", help="keep saves in this SQLite database")
+    parser.add_argument("--player", metavar="NAME", default=saves.DEFAULT_PLAYER, help="whose saves to use")
+    parser.add_argument("--analytics", metavar="PATH", help="aggregate gameplay stats into this JSON file")
+    args = parser.parse_args(argv)
+    if not saves.valid_name(args.player):
+        raise SystemExit(f"⚠️  Invalid player name '{args.player}': use only letters, digits and _.")
+
+    set_headless(args.headless)
+    set_delays(not args.no_delay)
+    if args.save_db:
+        save_backend = saves.SQLiteSaveBackend(args.save_db)
+    save_player_id = args.player
+    if args.analytics:
+        stats = analytics.Analytics(args.analytics)
 
 
 if __name__ == "__main__":
+    parse_args(sys.argv[1:])
     main_game_loop()
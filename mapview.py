@@ -0,0 +1,257 @@
+"""
+Map layout for the rooms a player has visited.
+
+A MapLayout is an event sink for one session. It gives every visited room a
+cell on an integer grid the moment the room is first entered: next to the
+room the player came from if a cell there is free, otherwise the nearest
+free cell around it. Edges are added as soon as both ends are placed, and
+when the riddle opens a new passage. Nothing already placed ever moves, so
+the layout is never recomputed during play; only loading a save or undoing
+a move re-syncs it with the rooms' visited flags (rooms that are still
+visited keep their cells).
+
+render() draws an ASCII viewport around the player, cached until the layout
+or the player's position changes. Other views (the GUI canvas) call
+changes() to draw only what was added since they last looked.
+
+This module must not import main (main imports it).
+"""
+
+from collections import deque
+
+import events
+
+# Search order around a cell: the four sides first, so most edges stay short and straight
+_RING1 = ((1, 0), (0, 1), (-1, 0), (0, -1), (1, 1), (-1, 1), (-1, -1), (1, -1))
+
+NAME_WIDTH = 10     # room names are cut to this many characters in the ASCII map
+GAP = 3             # characters between two cells
+
+
+def _ring(radius):
+    """
+    Offsets at Chebyshev distance `radius`, nearest (Manhattan) first.
+    """
+    if radius == 1:
+        return _RING1
+    cells = [(dx, dy) for dx in range(-radius, radius + 1) for dy in range(-radius, radius + 1)
+             if max(abs(dx), abs(dy)) == radius]
+    cells.sort(key=lambda d: abs(d[0]) + abs(d[1]))
+    return cells
+
+
+class MapLayout:
+    def __init__(self, rooms):
+        self.rooms = rooms
+        self.positions = {}     # room name -> (x, y)
+        self.cells = {}         # (x, y) -> room name
+        self.edges = {}         # room name -> set of placed neighbours
+        self.incoming = {}      # unplaced room name -> placed rooms with a passage to it
+        self.last = None        # room the player was last seen in
+        self.version = 0
+        self._log = []          # ("room", name) / ("edge", a, b) since the last reset
+        self._generation = 0
+        self._render_cache = {}
+
+    # ----------------------------
+    #   Event Sink
+    # ----------------------------
+
+    def __call__(self, event):
+        kind = type(event)
+        if kind is events.RoomEntered:
+            name = event.room.name
+            if name not in self.positions:
+                self.place(name)
+            self.last = name
+        elif kind is events.RiddleAnswered:
+            if event.unlocked and event.room in self.positions:
+                self.connect(event.room, event.unlocked)
+        elif kind is events.GameLoaded or kind is events.Undone:
+            self.sync()
+
+    # ----------------------------
+    #   Incremental Updates
+    # ----------------------------
+
+    def _free_cell_near(self, origin):
+        x, y = origin
+        if origin not in self.cells:
+            return origin
+        radius = 1
+        while True:
+            for dx, dy in _ring(radius):
+                cell = (x + dx, y + dy)
+                if cell not in self.cells:
+                    return cell
+            radius += 1
+
+    def place(self, name):
+        """
+        Give a newly visited room a cell and connect it to placed neighbours.
+        """
+        room = self.rooms[name]
+        neighbours = [c for c in room.connections if c in self.positions]
+        neighbours += [c for c in self.incoming.get(name, ()) if c not in neighbours]
+        if self.last in neighbours:
+            anchor = self.positions[self.last]
+        elif neighbours:
+            anchor = self.positions[neighbours[0]]
+        else:
+            anchor = (0, 0)
+
+        cell = self._free_cell_near(anchor)
+        self.positions[name] = cell
+        self.cells[cell] = name
+        self.edges[name] = set()
+        self._log.append(("room", name))
+        self._changed()
+
+        for other in neighbours:
+            self.connect(name, other)
+        self.incoming.pop(name, None)
+        for target in room.connections:
+            if target not in self.positions:
+                self.incoming.setdefault(target, set()).add(name)
+
+    def connect(self, a, b):
+        """
+        Record a passage between a placed room and another room.
+        """
+        if b not in self.positions:
+            self.incoming.setdefault(b, set()).add(a)
+            return
+        if b in self.edges[a]:
+            return
+        self.edges[a].add(b)
+        self.edges[b].add(a)
+        self._log.append(("edge", a, b))
+        self._changed()
+
+    def sync(self):
+        """
+        Match the layout to the rooms' visited flags after a load or undo.
+        Rooms still visited keep their cells; the rest are dropped.
+        """
+        for name in [n for n in self.positions if n not in self.rooms or not self.rooms[n].visited]:
+            del self.cells[self.positions.pop(name)]
+            del self.edges[name]
+        self.edges = {name: set() for name in self.positions}
+        self.incoming = {}
+        self._log = []
+        self._generation += 1
+        self._changed()
+
+        visited = {n for n, r in self.rooms.items() if r.visited}
+        around = {name: set() for name in visited}
+        for name in visited:
+            for target in self.rooms[name].connections:
+                if target in visited:
+                    around[name].add(target)
+                    around[target].add(name)
+
+        for name in list(self.positions):
+            for target in self.rooms[name].connections:
+                self.connect(name, target)
+
+        # Newly visited rooms are placed next to already placed ones, spreading outwards
+        queue = deque(self.positions)
+        unplaced = visited - self.positions.keys()
+        while unplaced:
+            while queue:
+                name = queue.popleft()
+                for target in sorted(around[name] & unplaced):
+                    unplaced.discard(target)
+                    self.last = name
+                    self.place(target)
+                    queue.append(target)
+            if unplaced:
+                # Not reachable from anything placed: start a new cluster
+                name = min(unplaced)
+                unplaced.discard(name)
+                self.last = None
+                self.place(name)
+                queue.append(name)
+        self.last = None
+
+    def _changed(self):
+        self.version += 1
+        self._render_cache.clear()
+
+    def changes(self, token=None):
+        """
+        What was added since `token` (as returned by the previous call).
+        Returns (changes, token); changes is None when the layout was reset
+        and the caller must redraw everything from positions and edges.
+        """
+        if token is None or token[0] != self._generation:
+            return None, (self._generation, len(self._log))
+        return self._log[token[1]:], (self._generation, len(self._log))
+
+    # ----------------------------
+    #   ASCII Rendering
+    # ----------------------------
+
+    def render(self, location, radius_x=3, radius_y=3):
+        """
+        The map around `location` as text. '>name<' is the player's room and
+        '+' marks rooms with passages that don't fit on the grid or the screen.
+        """
+        key = (location, radius_x, radius_y)
+        text = self._render_cache.get(key)
+        if text is None:
+            text = self._render_cache[key] = self._render(location, radius_x, radius_y)
+        return text
+
+    def _render(self, location, radius_x, radius_y):
+        if not self.positions:
+            return "  (nothing explored yet)"
+        cx, cy = self.positions.get(location, (0, 0))
+        xs = range(cx - radius_x, cx + radius_x + 1)
+        ys = range(cy - radius_y, cy + radius_y + 1)
+        cell_width = NAME_WIDTH + 2
+        cells = self.cells
+
+        def linked(a, b):
+            return a is not None and b is not None and b in self.edges[a]
+
+        lines = []
+        for y in ys:
+            top, below = [], []
+            for x in xs:
+                name = cells.get((x, y))
+                right = cells.get((x + 1, y))
+                if name is None:
+                    top.append(" " * cell_width)
+                else:
+                    drawn = 0
+                    for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)):
+                        nx, ny = x + dx, y + dy
+                        if nx in xs and ny in ys and linked(name, cells.get((nx, ny))):
+                            drawn += 1
+                    more = "+" if drawn < len(self.edges[name]) else ""
+                    label = (name[:NAME_WIDTH - len(more)] + more).center(NAME_WIDTH)
+                    ends = "><" if name == location else "[]"
+                    top.append(ends[0] + label + ends[1])
+                if x != xs[-1]:
+                    top.append(("─" if linked(name, right) else " ") * GAP)
+
+                down = cells.get((x, y + 1))
+                mid = " " * (cell_width // 2) + ("│" if linked(name, down) else " ")
+                below.append(mid.ljust(cell_width))
+                if x != xs[-1]:
+                    falling = linked(name, cells.get((x + 1, y + 1)))
+                    rising = linked(right, down)
+                    mark = "X" if falling and rising else "╲" if falling else "╱" if rising else " "
+                    below.append(" " + mark + " ")
+            lines.append("".join(top).rstrip())
+            if y != ys[-1]:
+                lines.append("".join(below).rstrip())
+
+        # Drop blank rows at the edges of the viewport
+        while lines and not lines[0].strip():
+            lines.pop(0)
+        while lines and not lines[-1].strip():
+            lines.pop()
+        indent = min(len(l) - len(l.lstrip()) for l in lines if l.strip())
+        return "\n".join("  " + l[indent:] for l in lines)
@@ -0,0 +1,281 @@
+"""
+Save game storage.
+
+A save backend stores one JSON-able game state per (player, slot):
+
+    backend.save(player_id, slot, data)
+    backend.load(player_id, slot)      -> data or None
+    backend.list_saves(player_id)      -> [(slot, saved_at), ...] newest first
+    backend.delete(player_id, slot)
+
+Player ids and slot names are limited to letters, digits and "_" (see
+valid_name), so they are always safe to use in file names.
+
+JsonFileBackend keeps the original behaviour (savegame.json in the working
+directory) for the default player and slot. SQLiteSaveBackend keeps every
+player's saves in one SQLite database in WAL mode, so concurrent readers are
+not blocked by writers, and groups writes made inside `with backend.batch():`
+into a single transaction.
+
+Import existing JSON saves into a database with:
+
+    python saves.py import saves.db savegame.json saves/alice/default.json ...
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_PLAYER = "player"
+DEFAULT_SLOT = "default"
+SAVES_DIR = "saves"        # JsonFileBackend: saves/<player>/<slot>.json
+
+_NAME = re.compile(r"[A-Za-z0-9_]+")
+
+def valid_name(name):
+    """
+    True if `name` can be used as a player id or slot name.
+    """
+    return _NAME.fullmatch(name) is not None
+
+
+class SaveBackend:
+    def save(self, player_id, slot, data):
+        raise NotImplementedError
+
+    def load(self, player_id, slot):
+        raise NotImplementedError
+
+    def list_saves(self, player_id):
+        raise NotImplementedError
+
+    def delete(self, player_id, slot):
+        raise NotImplementedError
+
+    @contextmanager
+    def batch(self):
+        """
+        Group several saves; backends that can't batch just write them one by one.
+        """
+        yield self
+
+
+class SaveSlots:
+    """
+    One player's saves in a backend: where a game session saves to.
+    """
+    def __init__(self, backend, player_id=DEFAULT_PLAYER):
+        self.backend = backend
+        self.player_id = player_id
+
+    def save(self, slot, data):
+        self.backend.save(self.player_id, slot, data)
+
+    def load(self, slot):
+        return self.backend.load(self.player_id, slot)
+
+    def list_saves(self):
+        return self.backend.list_saves(self.player_id)
+
+
+class JsonFileBackend(SaveBackend):
+    """
+    One JSON file per save. The default player/slot maps to savegame.json so
+    existing saves keep working; others go to saves/<player>/<slot>.json.
+    """
+    def __init__(self, directory="."):
+        self.directory = directory
+
+    def player_dir(self, player_id):
+        return os.path.join(self.directory, SAVES_DIR, player_id)
+
+    def path(self, player_id, slot):
+        if not (valid_name(player_id) and valid_name(slot)):
+            raise ValueError(f"invalid save name: {player_id!r} / {slot!r}")
+        if player_id == DEFAULT_PLAYER and slot == DEFAULT_SLOT:
+            return os.path.join(self.directory, "savegame.json")
+        return os.path.join(self.player_dir(player_id), f"{slot}.json")
+
+    def save(self, player_id, slot, data):
+        path = self.path(player_id, slot)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    def load(self, player_id, slot):
+        try:
+            with open(self.path(player_id, slot), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def list_saves(self, player_id):
+        found = []
+        slots = {DEFAULT_SLOT} if player_id == DEFAULT_PLAYER else set()
+        try:
+            names = os.listdir(self.player_dir(player_id))
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext == ".json" and valid_name(stem):
+                slots.add(stem)
+        for slot in slots:
+            try:
+                found.append((slot, os.path.getmtime(self.path(player_id, slot))))
+            except FileNotFoundError:
+                pass
+        found.sort(key=lambda s: s[1], reverse=True)
+        return found
+
+    def delete(self, player_id, slot):
+        try:
+            os.remove(self.path(player_id, slot))
+        except FileNotFoundError:
+            pass
+
+
+class SQLiteSaveBackend(SaveBackend):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS saves (
+            player_id TEXT NOT NULL,
+            slot      TEXT NOT NULL,
+            saved_at  REAL NOT NULL,
+            data      TEXT NOT NULL,
+            PRIMARY KEY (player_id, slot)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS saves_by_player_time ON saves (player_id, saved_at DESC);
+    """
+
+    def __init__(self, path="saves.db"):
+        self.path = path
+        # One connection shared by all threads of this process, guarded by a lock
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        self._local = threading.local()   # .pending: rows queued by this thread's batch()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _write(self, rows):
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO saves (player_id, slot, saved_at, data) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def save(self, player_id, slot, data):
+        row = (player_id, slot, time.time(), json.dumps(data))
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending.append(row)
+        else:
+            self._write([row])
+
+    def save_many(self, records):
+        """
+        Write [(player_id, slot, data), ...] in one transaction.
+        """
+        now = time.time()
+        self._write([(p, s, now, json.dumps(d)) for p, s, d in records])
+
+    @contextmanager
+    def batch(self):
+        """
+        Saves made inside the block are written together in one transaction
+        when it ends (nothing is written if it raises).
+        """
+        if getattr(self._local, "pending", None) is not None:   # already batching
+            yield self
+            return
+        self._local.pending = []
+        try:
+            yield self
+            pending = self._local.pending
+        finally:
+            self._local.pending = None
+        if pending:
+            self._write(pending)
+
+    def load(self, player_id, slot):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM saves WHERE player_id = ? AND slot = ?", (player_id, slot)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_saves(self, player_id):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT slot, saved_at FROM saves WHERE player_id = ? ORDER BY saved_at DESC",
+                (player_id,),
+            ).fetchall()
+
+    def delete(self, player_id, slot):
+        with self.lock:
+            self.conn.execute("DELETE FROM saves WHERE player_id = ? AND slot = ?", (player_id, slot))
+
+
+# ----------------------------
+#   Migration
+# ----------------------------
+
+def import_json_saves(backend, paths, slot=DEFAULT_SLOT):
+    """
+    Copy existing JSON save files into `backend` in one batch. savegame.json
+    becomes the default player's save and saves/<player>/<slot>.json keeps
+    its player and slot; any other file is imported under its own name as
+    the player id, into `slot`. Returns the number of saves imported;
+    unreadable files and invalid names are skipped.
+    """
+    records = []
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print(f"⚠️  Skipping {path}: not a readable save file.")
+            continue
+        stem = os.path.splitext(os.path.basename(path))[0]
+        parent = os.path.dirname(os.path.abspath(path))
+        if stem == "savegame":
+            player_id, slot_name = DEFAULT_PLAYER, DEFAULT_SLOT
+        elif os.path.basename(os.path.dirname(parent)) == SAVES_DIR:
+            player_id, slot_name = os.path.basename(parent), stem
+        else:
+            player_id, slot_name = stem, slot
+        if not (valid_name(player_id) and valid_name(slot_name)):
+            print(f"⚠️  Skipping {path}: '{player_id}' / '{slot_name}' is not a valid save name.")
+            continue
+        records.append((player_id, slot_name, data))
+
+    with backend.batch():
+        for player_id, slot_name, data in records:
+            backend.save(player_id, slot_name, data)
+    return len(records)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4 or sys.argv[1] != "import":
+        print("Usage: python saves.py import <database> <save.json> [<save.json> ...]")
+        sys.exit(1)
+    db = SQLiteSaveBackend(sys.argv[2])
+    count = import_json_saves(db, sys.argv[3:])
+    db.close()
+    print(f"💾  Imported {count} save(s) into {sys.argv[2]}.")
@@ -0,0 +1,144 @@
+"""
+In-memory snapshots of a game session, for undo and lookahead search.
+
+A Snapshotter watches one session (player, rooms and, for search code that
+needs repeatable dice, the session's random.Random). Rooms report every
+change into its journal, so it always knows which rooms differ from their
+shared templates. A snapshot only stores those rooms; room state is made of
+immutable tuples (see main.Room), so a snapshot holds references rather than
+copies. Taking and restoring one costs O(rooms changed + inventory), not
+O(world).
+
+    snap = Snapshotter(player, rooms)
+    state = snap.snapshot()
+    ...play some hypothetical moves...
+    snap.restore(state)
+
+or, for search code:
+
+    with snap.branch():
+        ...moves are undone when the block ends...
+"""
+
+from collections import deque
+from contextlib import contextmanager
+
+# Room.state() of a room this session never changed
+UNCHANGED = (None, None, False)
+
+
+class GameState:
+    """
+    One frozen point in a session. Treat as immutable.
+    """
+    __slots__ = ("location", "hp", "inventory", "rooms", "rng_state")
+
+    def __init__(self, location, hp, inventory, rooms, rng_state):
+        self.location = location
+        self.hp = hp
+        self.inventory = inventory     # tuple
+        self.rooms = rooms             # {room name: Room.state()} for changed rooms only
+        self.rng_state = rng_state     # None unless the Snapshotter has an rng
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return (self.location == other.location and self.hp == other.hp
+                and self.inventory == other.inventory and self.rooms == other.rooms
+                and self.rng_state == other.rng_state)
+
+    __hash__ = None
+
+
+class Snapshotter:
+    def __init__(self, player, rooms, rng=None):
+        self.player = player
+        self.rooms = rooms
+        self.rng = rng
+        self.changed = set()    # names of rooms that differ from their template
+        self.tracked = 0
+        self._track_new_rooms()
+
+    def _track_new_rooms(self):
+        # Hot reload hands new rooms the journal itself (hotreload.apply_rooms_diff);
+        # this catches rooms added any other way, rescanning only when the count changes
+        for name, room in self.rooms.items():
+            if room.journal is not self.changed:
+                room.journal = self.changed
+                if room.state() != UNCHANGED:
+                    self.changed.add(name)
+        self.tracked = len(self.rooms)
+
+    def snapshot(self):
+        rooms = self.rooms
+        if len(rooms) != self.tracked:
+            self._track_new_rooms()
+        return GameState(
+            self.player.location,
+            self.player.hp,
+            tuple(self.player.inventory),
+            {name: rooms[name].state() for name in self.changed if name in rooms},
+            None if self.rng is None else self.rng.getstate(),
+        )
+
+    def restore(self, state):
+        player = self.player
+        player.location = state.location
+        player.hp = state.hp
+        player.inventory[:] = state.inventory
+
+        for name in self.changed | state.rooms.keys():
+            room = self.rooms.get(name)
+            if room is None:
+                continue
+            saved = state.rooms.get(name)
+            if saved is None:
+                # Changed since the snapshot was taken: back to the plain template
+                saved = UNCHANGED
+            room.set_state(saved)
+
+        self.changed.clear()
+        self.changed.update(state.rooms)
+        if self.rng is not None:
+            self.rng.setstate(state.rng_state)
+
+    @contextmanager
+    def branch(self):
+        """
+        Explore a hypothetical future; everything is rolled back afterwards.
+        """
+        state = self.snapshot()
+        try:
+            yield state
+        finally:
+            self.restore(state)
+
+
+class UndoHistory:
+    """
+    The last few states of a session, for the 'undo' command. Call
+    checkpoint() before a command and commit() after it: the state is only
+    kept if the command changed something, so looking around (inventory,
+    map, help) never uses up undo steps.
+    """
+    def __init__(self, snapshotter, depth=20):
+        self.snapshotter = snapshotter
+        self.states = deque(maxlen=depth)
+        self.pending = None
+
+    def checkpoint(self):
+        self.pending = self.snapshotter.snapshot()
+
+    def commit(self):
+        pending, self.pending = self.pending, None
+        if pending is not None and pending != self.snapshotter.snapshot():
+            self.states.append(pending)
+
+    def undo(self):
+        """
+        Go back to the last checkpoint. Returns False if there is none.
+        """
+        if not self.states:
+            return False
+        self.snapshotter.restore(self.states.pop())
+        return True
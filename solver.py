@@ -0,0 +1,204 @@
+"""
+Winnability solver.
+
+The game is won by opening the chest in main.CHEST_ROOM while carrying
+main.CHEST_KEY. Only three things decide whether and how that can happen:
+where the player is, whether they hold the key, and whether the riddle
+passage has been opened. Every other item is irrelevant and ignored (the
+torch only matters by staying in the riddle room, so the solver never picks
+it up). HP and random hazards are not modelled.
+
+solve() finds the shortest winning command sequence for a live session with
+a memoised Dijkstra search over those states, or returns None when the
+world is unwinnable. check_content() decides, for every room the shuffle
+could put the key in, whether rooms.json is winnable; it runs two linear
+passes over the room graph, so it stays fast on generated worlds with
+thousands of rooms.
+
+    python solver.py [rooms.json]
+
+prints a solution for this process's shuffle, checks every key placement
+and exits with status 1 if any placement is unwinnable (for content builds).
+"""
+
+import heapq
+import itertools
+import json
+import sys
+from collections import deque
+
+import main
+
+# Any command the Cave doesn't recognise makes the voice ask the riddle;
+# riddle_trigger() picks one the Cave can't take for something else
+RIDDLE_TRIGGERS = ("listen", "hello voice")
+
+
+def riddle_trigger(rooms):
+    """
+    A command that makes the riddle room ask its riddle in this world: not a
+    command or exit, and close to nothing that would get a "did you mean".
+    """
+    probe = main.Player(start_location=main.RIDDLE_ROOM)
+    exits = {name.lower() for name in rooms[main.RIDDLE_ROOM].connections}
+    candidates = itertools.chain(RIDDLE_TRIGGERS, (f"hello voice {n}" for n in itertools.count(2)))
+    for command in candidates:
+        if (command not in main.COMMAND_PHRASES and command not in exits
+                and not main.suggest_command(probe, rooms, command)):
+            return command
+
+
+def _riddle_available(rooms):
+    """
+    True if answering the riddle would open a passage that isn't there yet.
+    """
+    room = rooms.get(main.RIDDLE_ROOM)
+    return (
+        room is not None
+        and main.RIDDLE_TARGET in rooms
+        and main.RIDDLE_ITEM in room.items
+        and main.RIDDLE_TARGET not in room.connections
+    )
+
+
+def solve(rooms, start, inventory=()):
+    """
+    Shortest list of commands that wins from `start`, or None if the game
+    cannot be won. `rooms` is a session's rooms dict (Room objects).
+    """
+    key_rooms = {name for name, room in rooms.items() if main.CHEST_KEY in room.items}
+    riddle = _riddle_available(rooms)
+    trigger = riddle_trigger(rooms) if riddle else None
+
+    # State: (location, has_key, riddle_opened); cost = number of commands
+    begin = (start, main.CHEST_KEY in inventory, False)
+    best = {begin: 0}
+    parent = {begin: None}
+    queue = [(0, 0, begin)]
+    order = 0   # tie-breaker so states never get compared
+
+    while queue:
+        cost, _, state = heapq.heappop(queue)
+        if cost > best[state]:
+            continue
+        location, has_key, opened = state
+
+        if has_key and location == main.CHEST_ROOM:
+            commands = ["open chest"]
+            while parent[state] is not None:
+                state, step = parent[state]
+                commands[:0] = step
+            return commands
+
+        moves = []
+        for target in rooms[location].connections:
+            if target in rooms:
+                moves.append(((target, has_key, opened), [target]))
+        if opened and location == main.RIDDLE_ROOM:
+            moves.append(((main.RIDDLE_TARGET, has_key, opened), [main.RIDDLE_TARGET]))
+        if not has_key and location in key_rooms:
+            moves.append(((location, True, opened), [f"pick up {main.CHEST_KEY}"]))
+        if riddle and not opened and location == main.RIDDLE_ROOM:
+            moves.append(((location, has_key, True), [trigger, main.RIDDLE_ANSWER]))
+
+        for next_state, step in moves:
+            next_cost = cost + len(step)
+            if next_cost < best.get(next_state, next_cost + 1):
+                best[next_state] = next_cost
+                parent[next_state] = (state, step)
+                order += 1
+                heapq.heappush(queue, (next_cost, order, next_state))
+    return None
+
+
+# ----------------------------
+#   Content Check
+# ----------------------------
+
+def _reachable(graph, sources):
+    seen = set(sources)
+    queue = deque(sources)
+    while queue:
+        for target in graph.get(queue.popleft(), ()):
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return seen
+
+
+def check_content(raw_rooms, start="Forest Entrance"):
+    """
+    For every room that can receive the key in the shuffle (rooms that list
+    items), decide whether the game is winnable. Returns
+    {"unwinnable": [rooms], "needs_riddle": [rooms]}: the first are hopeless
+    wherever the torch lands, the second only work if the torch is shuffled
+    into the riddle room.
+    """
+    graph = {
+        name: [c for c in data.get("connections", []) if c in raw_rooms]
+        for name, data in raw_rooms.items()
+    }
+    slots = [name for name, data in raw_rooms.items() if data.get("items")]
+
+    def winnable_key_rooms(graph):
+        # Forward from the start without the key, backward from the chest with it
+        before = _reachable(graph, [start])
+        reverse = {}
+        for name, targets in graph.items():
+            for target in targets:
+                reverse.setdefault(target, []).append(name)
+        after = _reachable(reverse, [main.CHEST_ROOM]) if main.CHEST_ROOM in graph else set()
+        return before & after
+
+    plain = winnable_key_rooms(graph)
+
+    # The riddle can only be used if the torch can be in the riddle room and it
+    # opens something new. The player may pick up the key before or after
+    # answering, so model the opened passage as a two-layer graph.
+    riddle_possible = (
+        main.RIDDLE_ROOM in raw_rooms and raw_rooms[main.RIDDLE_ROOM].get("items")
+        and main.RIDDLE_TARGET in raw_rooms and main.RIDDLE_TARGET not in graph[main.RIDDLE_ROOM]
+    )
+    with_riddle = set(plain)
+    if riddle_possible:
+        layered = {}
+        for name, targets in graph.items():
+            layered[(name, 0)] = [(t, 0) for t in targets]
+            layered[(name, 1)] = [(t, 1) for t in targets]
+        layered[(main.RIDDLE_ROOM, 0)].append((main.RIDDLE_ROOM, 1))
+        layered[(main.RIDDLE_ROOM, 1)].append((main.RIDDLE_TARGET, 1))
+        before = _reachable(layered, [(start, 0)])
+        reverse = {}
+        for node, targets in layered.items():
+            for target in targets:
+                reverse.setdefault(target, []).append(node)
+        after = _reachable(reverse, [(main.CHEST_ROOM, 0), (main.CHEST_ROOM, 1)])
+        with_riddle = {name for (name, layer) in before & after}
+
+    return {
+        "unwinnable": [name for name in slots if name not in with_riddle],
+        "needs_riddle": [name for name in slots if name in with_riddle and name not in plain],
+    }
+
+
+if __name__ == "__main__":
+    rooms_file = sys.argv[1] if len(sys.argv) > 1 else "rooms.json"
+    main.load_world(rooms_file)
+
+    key_room = next((n for n, r in main.rooms.items() if main.CHEST_KEY in r.items), None)
+    print(f"🔑  This shuffle put the key in: {key_room}")
+    solution = solve(main.rooms, "Forest Entrance")
+    if solution is None:
+        print("💀  This shuffle is unwinnable.")
+    else:
+        print(f"✅  Shortest win ({len(solution)} commands): {' → '.join(solution)}")
+
+    with open(rooms_file, "r") as f:
+        report = check_content(json.load(f))
+    for name in report["needs_riddle"]:
+        print(f"⚠️  Key in {name}: only winnable if the torch lands in {main.RIDDLE_ROOM}.")
+    for name in report["unwinnable"]:
+        print(f"❌  Key in {name}: unwinnable.")
+    if report["unwinnable"]:
+        sys.exit(1)
+    print(f"🎉  {rooms_file} is winnable for every key placement.")
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main
+
+
+@pytest.fixture
+def raw_rooms():
+    return main.load_rooms_raw(os.path.join(ROOT, "rooms.json"))
+
+
+@pytest.fixture
+def items():
+    return main.load_items(os.path.join(ROOT, "items.json"))
+
+
+@pytest.fixture(autouse=True)
+def no_delays(monkeypatch):
+    monkeypatch.setattr(main, "delays", False)
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+import analytics
+import events
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("accuracy", [0.01, 0.05])
+def test_quantiles_within_accuracy(accuracy):
+    rng = random.Random(3)
+    values = [rng.lognormvariate(3, 2) for _ in range(5000)] + [0] * 50
+    sketch = analytics.QuantileSketch(accuracy)
+    for value in values:
+        sketch.add(value)
+    assert sketch.count == len(values)
+    assert sketch.total == pytest.approx(sum(values))
+    for q in (0, 0.001, 0.01, 0.25, 0.5, 0.9, 0.99, 1):
+        exact = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= accuracy * exact + 1e-9, q
+
+
+def test_collapsing_buckets_keeps_upper_quantiles():
+    rng = random.Random(4)
+    # About 350 buckets' worth of values; the top 100 buckets cover everything above ~135
+    values = [rng.uniform(1, 1000) for _ in range(5000)]
+    sketch = analytics.QuantileSketch(0.01, max_buckets=100)
+    for value in values:
+        sketch.add(value)
+    assert len(sketch.buckets) <= 100
+    assert sketch.count == len(values)
+    for q in (0.9, 0.99, 1):
+        exact = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact, q
+    # Low values now share the lowest bucket, so they are overestimated, never lost
+    assert sketch.quantile(0) >= min(values)
+
+
+def test_merged_sketches_equal_one_sketch():
+    rng = random.Random(5)
+    values = [rng.expovariate(0.1) for _ in range(2000)]
+    whole, left, right = (analytics.QuantileSketch() for _ in range(3))
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(analytics.QuantileSketch.from_dict(right.to_dict()))
+    assert left.buckets == whole.buckets
+    assert left.count == whole.count
+
+
+@pytest.mark.parametrize("n", [10, 100, 1000, 20000])
+def test_hyperloglog_estimate(n):
+    hll = analytics.HyperLogLog()
+    for i in range(n):
+        hll.add(f"command {i}")
+        hll.add(f"command {i}")      # repeats don't count
+    assert abs(hll.estimate() - n) <= 0.1 * n + 1
+
+
+def test_hyperloglog_merge_is_the_union():
+    a, b, union = analytics.HyperLogLog(), analytics.HyperLogLog(), analytics.HyperLogLog()
+    for i in range(3000):
+        a.add(str(i))
+        union.add(str(i))
+    for i in range(2000, 6000):
+        b.add(str(i))
+        union.add(str(i))
+    a.merge(analytics.HyperLogLog.from_dict(b.to_dict()))
+    assert a.registers == union.registers
+    assert abs(a.estimate() - 6000) <= 600
+
+
+def test_flushes_add_up(tmp_path):
+    path = str(tmp_path / "analytics.json")
+    first, second = analytics.Analytics(path), analytics.Analytics(path)
+    for stats, wins in ((first, [10, 20]), (second, [30])):
+        stats.counters["verbs"].add("look", 2)
+        for turns in wins:
+            stats.sketches["win_turns"].add(turns)
+        stats.distinct["commands"].add(f"only in {len(wins)}")
+        stats.distinct["commands"].add("shared")
+
+    first.flush()
+    assert first.sketches["win_turns"].count == 0     # reset after flushing
+    second.flush()
+    first.flush()                                       # nothing new: adds nothing
+
+    total = analytics.load(path)
+    assert total.counters["verbs"].counts == {"look": 4}
+    assert total.sketches["win_turns"].count == 3
+    assert total.sketches["win_turns"].total == 60
+    assert round(total.distinct["commands"].estimate()) == 3
+
+
+def test_session_sink_flushes_when_the_game_ends(tmp_path):
+    path = str(tmp_path / "analytics.json")
+    stats = analytics.Analytics(path)
+    for _ in range(2):
+        sink = stats.session()
+        sink(events.GameStarted())
+        sink(events.CommandIssued("pick up key", "Lake"))
+        sink(events.GameWon("Hidden Chamber"))
+
+    total = analytics.load(path)
+    assert total.counters["events"].counts["GameWon"] == 2
+    assert total.sketches["win_turns"].count == 2
+    assert total.counters["verbs"].counts == {"pick": 2}
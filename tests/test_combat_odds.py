@@ -0,0 +1,83 @@
+import math
+import random
+
+import pytest
+
+import combat_odds
+import events
+import main
+
+FIGHTS = 2000
+
+# (player HP, enemy HP, attack, defense, enemy attack)
+LOADOUTS = [
+    (1, 5, 1, 0, 1),
+    (3, 5, 1, 0, 1),
+    (6, 5, 2, 0, 1),
+    (4, 3, 1, 0, 2),
+    (8, 5, 1, 1, 3),
+    (5, 6, 3, 1, 2),
+]
+
+
+class OneGoblin(main.PrivateWorld):
+    """
+    A private world whose Goblin has the given stats and can be watched.
+    """
+    def __init__(self, hp, attack):
+        self.goblin = main.Enemy(name="Goblin", hp=hp, attack=attack)
+
+    def enemy_in(self, room_name):
+        return self.goblin
+
+
+def fight(player_hp, enemy_hp, attack, defense, enemy_attack, policy, rng):
+    """
+    One handle_combat fight; returns ("win" | "flee" | "death", HP left).
+    """
+    player = main.Player(start_location="Forest Entrance", hp=player_hp)
+    player.inventory = ["blade", "plate"]
+    world = OneGoblin(enemy_hp, enemy_attack)
+    seen = []
+    bus = events.EventBus([seen.append])
+
+    def ask(prompt):
+        if policy != "optimal":
+            return policy
+        return combat_odds.recommended_action(player.hp, world.goblin.hp, attack, defense, enemy_attack)
+
+    main.handle_combat(bus, player, ask=ask, rng=rng, world=world)
+    last = seen[-1]
+    if isinstance(last, events.EnemyDefeated):
+        return "win", player.hp
+    if isinstance(last, events.PlayerDied):
+        return "death", 0
+    assert isinstance(last, events.CombatRound) and last.escaped
+    return "flee", player.hp
+
+
+@pytest.mark.parametrize("policy", combat_odds.POLICIES)
+@pytest.mark.parametrize("loadout", LOADOUTS)
+def test_odds_match_simulated_fights(monkeypatch, loadout, policy):
+    player_hp, enemy_hp, attack, defense, enemy_attack = loadout
+    monkeypatch.setattr(main, "items_data", {
+        "blade": {"type": "weapon", "damage": attack - 1},
+        "plate": {"type": "armor", "defense": defense},
+    })
+    expected = combat_odds.combat_outcome(player_hp, enemy_hp, attack, defense, policy, enemy_attack)
+    if expected.stalemate:
+        pytest.skip("the fight never ends under this policy")
+
+    rng = random.Random(LOADOUTS.index(loadout) * 10 + combat_odds.POLICIES.index(policy))
+    counts = {"win": 0, "flee": 0, "death": 0}
+    hp_left = 0
+    for _ in range(FIGHTS):
+        result, hp = fight(player_hp, enemy_hp, attack, defense, enemy_attack, policy, rng)
+        counts[result] += 1
+        hp_left += hp
+
+    for result in counts:
+        p = getattr(expected, result)
+        tolerance = 4 * math.sqrt(p * (1 - p) / FIGHTS) + 1e-9
+        assert abs(counts[result] / FIGHTS - p) <= tolerance, (result, counts, expected)
+    assert abs(hp_left / FIGHTS - expected.expected_hp) <= 4 * player_hp / math.sqrt(FIGHTS)
@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+import fuzzy
+import main
+
+LETTERS = "abcde "
+
+
+def random_word(rng, longest=8):
+    return "".join(rng.choice(LETTERS) for _ in range(rng.randint(1, longest)))
+
+
+def reference_distance(a, b):
+    """
+    Optimal string alignment distance, straight from the full table.
+    """
+    d = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def brute_force(word, names, max_distance):
+    found = [(fuzzy.edit_distance(word, name), name) for name in set(names)]
+    return sorted((d, name) for d, name in found if d <= max_distance)
+
+
+def test_edit_distance_matches_reference():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a, b = random_word(rng), random_word(rng)
+        expected = reference_distance(a, b)
+        assert fuzzy.edit_distance(a, b) == expected, (a, b)
+        for limit in range(4):
+            assert fuzzy.edit_distance(a, b, limit) == min(expected, limit + 1), (a, b, limit)
+
+
+def test_swapped_letters_cost_one_edit():
+    assert fuzzy.edit_distance("caev", "cave") == 1
+    assert fuzzy.edit_distance("hlep", "help") == 1
+    assert fuzzy.edit_distance("abcd", "badc") == 2
+
+
+@pytest.mark.parametrize("max_distance", [0, 1, 2, 3])
+def test_search_matches_brute_force(max_distance):
+    rng = random.Random(max_distance)
+    names = [random_word(rng) for _ in range(300)]
+    index = fuzzy.NameIndex(names)
+    for _ in range(200):
+        word = random_word(rng)
+        expected = brute_force(word, names, max_distance)
+        assert index.search(word, max_distance) == expected, word
+
+        # Both `within` paths: a room-sized set is scanned, a large one uses postings
+        small = set(rng.sample(names, 10))
+        large = set(rng.sample(names, fuzzy.NameIndex.SCAN_LIMIT + 10))
+        assert index.search(word, max_distance, small) == brute_force(word, small, max_distance)
+        assert index.search(word, max_distance, large) == brute_force(word, large, max_distance)
+
+
+def test_within_names_are_found_on_both_paths():
+    index = fuzzy.NameIndex(["rope"])
+    assert index.search("ropr", 1, {"rope", "torch"}) == [(1, "rope")]
+    assert index.search("trhc", 2, {"torch"}) == [(2, "torch")]
+    many = {f"stone {i}" for i in range(fuzzy.NameIndex.SCAN_LIMIT + 1)} | {"lantern"}
+    assert index.search("lantren", 2, many) == [(1, "lantern")]
+
+
+def test_discard_keeps_names_added_twice():
+    index = fuzzy.NameIndex(["key", "key", "map"])
+    index.discard("key")
+    assert "key" in index
+    index.discard("key")
+    assert "key" not in index
+    assert index.search("kez", 1) == []
+    assert index.search("mab", 1) == [(1, "map")]
+
+
+@pytest.fixture
+def player(raw_rooms):
+    rooms = {name: main.Room(name, data) for name, data in raw_rooms.items()}
+    return main.Player(start_location="Forest Entrance", hp=10), rooms
+
+
+@pytest.mark.parametrize("cmd, expected", [
+    ("caev", ["Cave"]),
+    ("lkae", ["Lake"]),
+    ("old towre", ["Old Tower"]),
+    ("hlep", ["help"]),
+    ("mpa", ["map"]),
+    ("veiw inventory", ["view inventory"]),
+    ("pick up lanetrn", ["pick up lantern"]),
+    ("pik up map", ["pick up map"]),
+    ("use ptoion", ["use potion"]),
+    ("uze potion", ["use potion"]),
+    ("xyzzy", []),
+    ("pick up sword", []),
+])
+def test_suggest_command(player, cmd, expected):
+    player, rooms = player
+    player.pick_up("potion")
+    assert main.suggest_command(player, rooms, cmd) == expected
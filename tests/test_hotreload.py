@@ -0,0 +1,152 @@
+import json
+import os
+
+import hotreload
+import main
+
+
+class Content:
+    """
+    rooms.json / items.json in a temp dir, with a watcher and any number of sessions.
+    """
+    def __init__(self, tmp_path, raw_rooms, items):
+        self.rooms_file = tmp_path / "rooms.json"
+        self.items_file = tmp_path / "items.json"
+        self.raw_rooms = {name: dict(data) for name, data in raw_rooms.items()}
+        self.rooms_file.write_text(json.dumps(self.raw_rooms))
+        self.items_file.write_text(json.dumps(items))
+        self.templates = {name: main.RoomTemplate(name, data) for name, data in raw_rooms.items()}
+        self.watcher = hotreload.ContentWatcher(
+            self.raw_rooms, dict(items), self.templates, main.RoomTemplate, main.Room,
+            str(self.rooms_file), str(self.items_file))
+        self.ticks = 0
+
+    def session(self, location="Forest Entrance"):
+        player = main.Player(start_location=location, hp=10)
+        rooms = {name: main.Room(name, template) for name, template in self.templates.items()}
+        self.watcher.register(rooms, [player])
+        return player, rooms
+
+    def write(self, path, text):
+        # A fresh mtime every time, so the edit is seen even on coarse clocks
+        path.write_text(text)
+        self.ticks += 1
+        stamp = os.stat(path).st_mtime_ns + self.ticks * 1_000_000_000
+        os.utime(path, ns=(stamp, stamp))
+
+    def edit_rooms(self, change):
+        rooms = json.loads(json.dumps(self.watcher.rooms_snapshot))
+        change(rooms)
+        self.write(self.rooms_file, json.dumps(rooms))
+
+
+def test_diff_rooms():
+    old = {
+        "A": {"description": "a", "connections": ["B"], "items": ["x"]},
+        "B": {"description": "b", "connections": ["A"]},
+        "C": {"description": "c"},
+    }
+    new = {
+        "A": {"description": "a2", "hints": "h", "connections": ["D"], "items": ["y"]},
+        "B": {"description": "b", "connections": ["A"]},
+        "D": {"description": "d", "connections": ["A"]},
+    }
+    diff = hotreload.diff_rooms(old, new)
+    assert diff["added"] == {"D": new["D"]}
+    assert diff["removed"] == ["C"]
+    # Item lists of existing rooms are session state, not content changes
+    assert diff["changed"] == {"A": {
+        "description": "a2", "hints": "h", "connections_added": ["D"], "connections_removed": ["B"],
+    }}
+
+
+def test_session_connections_survive_reload(tmp_path, raw_rooms, items):
+    content = Content(tmp_path, raw_rooms, items)
+    player, rooms = content.session()
+    cave = rooms["Cave"]
+    cave.add_connection("Crystal Cavern")     # opened during play
+    cave.remove_item("torch")
+
+    def edit(rooms):
+        rooms["Cave"]["description"] = "A reworded cave."
+        rooms["Cave"]["connections"].append("Lake")
+        rooms["Cave"]["connections"].remove("Forest Entrance")
+    content.edit_rooms(edit)
+    assert content.watcher.check()
+
+    assert cave.description == "A reworded cave."
+    assert cave.connections == ("Hidden Chamber", "Crystal Cavern", "Lake")
+    assert "torch" not in cave.items
+    # A session that never touched the Cave reads it straight from the new template
+    _, fresh = content.session()
+    assert fresh["Cave"].connections == ("Hidden Chamber", "Lake")
+    assert fresh["Cave"].template is cave.template
+
+
+def test_removed_room_is_kept_while_someone_stands_in_it(tmp_path, raw_rooms, items):
+    content = Content(tmp_path, raw_rooms, items)
+    inside, inside_rooms = content.session(location="Abandoned Hut")
+    outside, outside_rooms = content.session()
+    hut = inside_rooms["Abandoned Hut"]
+
+    def edit(rooms):
+        del rooms["Abandoned Hut"]
+    content.edit_rooms(edit)
+    assert content.watcher.check()
+
+    assert inside_rooms["Abandoned Hut"] is hut
+    assert hut.description == raw_rooms["Abandoned Hut"]["description"]
+    assert "Abandoned Hut" not in outside_rooms
+    assert "Abandoned Hut" not in content.templates
+    assert "Abandoned Hut" not in content.raw_rooms
+
+
+def test_new_rooms_share_one_template(tmp_path, raw_rooms, items):
+    content = Content(tmp_path, raw_rooms, items)
+    sessions = [content.session() for _ in range(3)]
+    added = []
+    content.watcher.on_new_name = added.append
+
+    def edit(rooms):
+        rooms["Cellar"] = {"description": "Dark.", "items": ["candle"], "connections": ["Cave"]}
+    content.edit_rooms(edit)
+    assert content.watcher.check()
+
+    template = content.templates["Cellar"]
+    for _, rooms in sessions:
+        assert rooms["Cellar"].template is template
+        assert rooms["Cellar"].items == ("candle",)
+    assert added == ["cellar", "candle"]
+
+    # Each session still picks up its own copy of the items
+    sessions[0][1]["Cellar"].remove_item("candle")
+    assert sessions[1][1]["Cellar"].items == ("candle",)
+
+
+def test_half_written_file_is_retried(tmp_path, raw_rooms, items):
+    content = Content(tmp_path, raw_rooms, items)
+    _, rooms = content.session()
+    edited = json.loads(json.dumps(raw_rooms))
+    edited["Lake"]["description"] = "A still lake."
+    text = json.dumps(edited)
+
+    content.write(content.rooms_file, text[:len(text) // 2])
+    assert not content.watcher.check()
+    assert rooms["Lake"].description == raw_rooms["Lake"]["description"]
+
+    content.write(content.rooms_file, text)
+    assert content.watcher.check()
+    assert rooms["Lake"].description == "A still lake."
+    assert not content.watcher.check()
+
+
+def test_item_stats_reload_in_place(tmp_path, raw_rooms, items):
+    content = Content(tmp_path, raw_rooms, items)
+    items_data = content.watcher.items_data
+    edited = dict(items)
+    edited["potion"] = dict(items["potion"], heal_amount=9)
+    edited["elixir"] = {"type": "healing", "heal_amount": 5}
+    content.write(content.items_file, json.dumps(edited))
+    assert content.watcher.check()
+    assert items_data["potion"]["heal_amount"] == 9
+    assert "elixir" in items_data
@@ -0,0 +1,112 @@
+import json
+import sqlite3
+
+import pytest
+
+import main
+import saves
+
+
+@pytest.fixture
+def db(tmp_path):
+    backend = saves.SQLiteSaveBackend(str(tmp_path / "saves.db"))
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Make time.time() tick one second per call, so save times are distinct.
+    """
+    now = [1000.0]
+
+    def tick():
+        now[0] += 1
+        return now[0]
+    monkeypatch.setattr(saves.time, "time", tick)
+
+
+def test_sqlite_round_trip_and_listing_order(db, clock):
+    for slot in ("first", "second", "third"):
+        db.save("alice", slot, {"slot": slot})
+    db.save("alice", "first", {"slot": "first", "again": True})
+    db.save("bob", "other", {})
+
+    assert db.load("alice", "first") == {"slot": "first", "again": True}
+    assert db.load("alice", "missing") is None
+    assert [slot for slot, _ in db.list_saves("alice")] == ["first", "third", "second"]
+    db.delete("alice", "third")
+    assert [slot for slot, _ in db.list_saves("alice")] == ["first", "second"]
+
+
+def test_sqlite_batch_commits_together(db):
+    with db.batch():
+        db.save("alice", "a", {"n": 1})
+        with db.batch():     # nested batches join the outer one
+            db.save("alice", "b", {"n": 2})
+        assert db.load("alice", "a") is None
+    assert db.load("alice", "a") == {"n": 1}
+    assert db.load("alice", "b") == {"n": 2}
+
+
+def test_sqlite_batch_writes_nothing_if_it_raises(db):
+    with pytest.raises(RuntimeError):
+        with db.batch():
+            db.save("alice", "a", {})
+            raise RuntimeError
+    assert db.load("alice", "a") is None
+    db.save("alice", "a", {"later": True})
+    assert db.load("alice", "a") == {"later": True}
+
+
+def test_sqlite_failed_write_rolls_back(db):
+    with pytest.raises(sqlite3.IntegrityError):
+        db.save_many([("alice", "a", {}), ("alice", None, {})])
+    assert db.load("alice", "a") is None
+    db.save_many([("alice", "a", {"ok": True})])
+    assert db.load("alice", "a") == {"ok": True}
+
+
+def test_import_json_saves(db, tmp_path, capsys):
+    def write(relative, text):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        return str(path)
+
+    paths = [
+        write("savegame.json", json.dumps({"who": "default"})),
+        write("saves/alice/morning.json", json.dumps({"who": "alice"})),
+        write("exports/bob.json", json.dumps({"who": "bob"})),
+        write("saves/carol/broken.json", "{not json"),
+        write("exports/bad-name.json", json.dumps({})),
+        str(tmp_path / "missing.json"),
+    ]
+    assert saves.import_json_saves(db, paths, slot="imported") == 3
+    assert db.load(saves.DEFAULT_PLAYER, saves.DEFAULT_SLOT) == {"who": "default"}
+    assert db.load("alice", "morning") == {"who": "alice"}
+    assert db.load("bob", "imported") == {"who": "bob"}
+    assert db.list_saves("carol") == []
+    assert capsys.readouterr().out.count("Skipping") == 3
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    for name in ("save_backend", "save_player_id", "stats", "headless", "delays"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+
+
+def test_parse_args(settings, tmp_path):
+    main.parse_args(["--headless", "--no-delay", "--player", "alice",
+                     "--save-db", str(tmp_path / "saves.db")])
+    assert main.headless and not main.delays
+    assert main.save_player_id == "alice"
+    assert isinstance(main.save_backend, saves.SQLiteSaveBackend)
+    main.save_backend.close()
+
+
+@pytest.mark.parametrize("argv", [["--player"], ["--save-db"], ["--player", "a/b"], ["--bogus"]])
+def test_parse_args_rejects_bad_arguments(settings, argv):
+    with pytest.raises(SystemExit):
+        main.parse_args(argv)
@@ -0,0 +1,122 @@
+import json
+import random
+
+import pytest
+
+import events
+import hotreload
+import main
+import snapshots
+
+
+def new_session(raw_rooms):
+    player = main.Player(start_location="Forest Entrance", hp=10)
+    rooms = {name: main.Room(name, data) for name, data in raw_rooms.items()}
+    return player, rooms
+
+
+def everything(player, rooms):
+    """
+    The whole session as plain data, independent of how snapshots store it.
+    """
+    return (player.location, player.hp, list(player.inventory),
+            {name: (room.template, room.to_dict()) for name, room in rooms.items()})
+
+
+def play(player, rooms, items, rng, steps):
+    """
+    Random moves, pickups and riddle answers; no combat, so `ask` only sees the riddle.
+    """
+    bus = events.EventBus()
+    for _ in range(steps):
+        room = rooms[player.location]
+        options = [name for name in room.connections if name in rooms]
+        options += [f"pick up {item}" for item in room.items]
+        if player.location == main.RIDDLE_ROOM:
+            options.append("listen")
+        main.handle_command(bus, player, rooms, items, rng.choice(options),
+                            ask=lambda prompt: main.RIDDLE_ANSWER, rng=rng)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_branch_rolls_back_everything(raw_rooms, items, seed):
+    rng = random.Random(seed)
+    player, rooms = new_session(raw_rooms)
+    snap = snapshots.Snapshotter(player, rooms)
+    play(player, rooms, items, rng, 5)
+    before = everything(player, rooms)
+
+    with snap.branch():
+        play(player, rooms, items, rng, 15)
+    assert everything(player, rooms) == before
+
+
+def test_restore_rewinds_rng(raw_rooms):
+    rng = random.Random(1)
+    player, rooms = new_session(raw_rooms)
+    snap = snapshots.Snapshotter(player, rooms, rng)
+    state = snap.snapshot()
+    first = [rng.random() for _ in range(5)]
+    snap.restore(state)
+    assert [rng.random() for _ in range(5)] == first
+
+
+def test_restore_keeps_reloaded_template(raw_rooms):
+    player, rooms = new_session(raw_rooms)
+    snap = snapshots.Snapshotter(player, rooms)
+    cave = rooms["Cave"]
+    state = snap.snapshot()
+    cave.remove_item("torch")
+    reloaded = cave.template.replace(description="A damp, freshly edited cave.")
+    cave.set_template(reloaded)
+
+    snap.restore(state)
+    assert cave.template is reloaded
+    assert cave.state() == snapshots.UNCHANGED
+    assert "torch" in cave.items
+
+
+def test_undo_skips_commands_that_change_nothing(raw_rooms, items):
+    player, rooms = new_session(raw_rooms)
+    history = snapshots.UndoHistory(snapshots.Snapshotter(player, rooms))
+    seen = []
+    bus = events.EventBus([seen.append])
+    item = rooms[player.location].items[0]
+
+    for command in (f"pick up {item}", "view inventory", "help", "undo"):
+        main.handle_command(bus, player, rooms, items, command, history=history)
+    assert isinstance(seen[-1], events.Undone)
+    assert player.inventory == []
+    assert item in rooms[player.location].items
+    assert rooms[player.location].state() == snapshots.UNCHANGED
+
+    main.handle_command(bus, player, rooms, items, "undo", history=history)
+    assert isinstance(seen[-1], events.NothingToUndo)
+
+
+def test_undo_in_room_added_by_hot_reload(raw_rooms, items, tmp_path):
+    rooms_file = tmp_path / "rooms.json"
+    items_file = tmp_path / "items.json"
+    rooms_file.write_text(json.dumps(raw_rooms))
+    items_file.write_text(json.dumps(items))
+    templates = {name: main.RoomTemplate(name, data) for name, data in raw_rooms.items()}
+    player, _ = new_session(raw_rooms)
+    rooms = {name: main.Room(name, template) for name, template in templates.items()}
+    watcher = hotreload.ContentWatcher(dict(raw_rooms), dict(items), templates, main.RoomTemplate,
+                                       main.Room, str(rooms_file), str(items_file))
+    watcher.register(rooms, [player])
+    history = snapshots.UndoHistory(snapshots.Snapshotter(player, rooms))
+
+    # Swap one room for another, so the number of rooms stays the same
+    edited = {name: dict(data) for name, data in raw_rooms.items() if name != "Abandoned Hut"}
+    edited["Forest Entrance"]["connections"] = ["Cave", "Lake", "Old Tower", "New Room"]
+    edited["New Room"] = {"description": "Freshly added.", "items": ["zzz"], "connections": ["Forest Entrance"]}
+    rooms_file.write_text(json.dumps(edited))
+    assert watcher.check()
+    assert len(rooms) == len(raw_rooms)
+
+    bus = events.EventBus()
+    for command in ("new room", "pick up zzz", "undo"):
+        main.handle_command(bus, player, rooms, items, command, history=history)
+    assert player.inventory == []
+    assert rooms["New Room"].items == ("zzz",)
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+import events
+import main
+import solver
+
+
+def shuffled_rooms(raw_rooms, seed):
+    random.seed(seed)
+    return {name: main.Room(name, data) for name, data in main.shuffle_items(raw_rooms).items()}
+
+
+def replay(rooms, items, commands):
+    """
+    Play `commands` through handle_command; returns the events emitted.
+    """
+    seen = []
+    bus = events.EventBus([seen.append])
+    player = main.Player(start_location="Forest Entrance", hp=10)
+    pending = iter(commands)
+    for command in pending:
+        main.handle_command(bus, player, rooms, items, command, ask=lambda prompt: next(pending))
+    return seen
+
+
+def without_passage(raw_rooms):
+    """
+    rooms.json with the Cave's passage to the chest removed, so only the riddle opens it.
+    """
+    raw = {name: dict(data) for name, data in raw_rooms.items()}
+    cave = raw[main.RIDDLE_ROOM]
+    cave["connections"] = [c for c in cave["connections"] if c != main.RIDDLE_TARGET]
+    return raw
+
+
+def test_solution_wins_when_replayed(raw_rooms, items):
+    wins = 0
+    for seed in range(100):
+        rooms = shuffled_rooms(raw_rooms, seed)
+        solution = solver.solve(rooms, "Forest Entrance")
+        if solution is None:
+            continue
+        seen = replay(rooms, items, solution)
+        assert isinstance(seen[-1], events.GameWon), (seed, solution)
+        assert not any(isinstance(e, (events.UnknownCommand, events.DidYouMean)) for e in seen)
+        wins += 1
+    assert wins > 0
+
+
+def test_riddle_solutions_win_when_replayed(raw_rooms, items):
+    raw = without_passage(raw_rooms)
+    riddles = 0
+    for seed in range(200):
+        rooms = shuffled_rooms(raw, seed)
+        solution = solver.solve(rooms, "Forest Entrance")
+        if solution is None:
+            continue
+        riddles += main.RIDDLE_ANSWER in solution
+        seen = replay(rooms, items, solution)
+        assert isinstance(seen[-1], events.GameWon), (seed, solution)
+    assert riddles > 0
+
+
+@pytest.mark.parametrize("passage", [True, False])
+def test_solver_agrees_with_content_check(raw_rooms, passage):
+    raw = raw_rooms if passage else without_passage(raw_rooms)
+    report = solver.check_content(raw)
+    for seed in range(200):
+        rooms = shuffled_rooms(raw, seed)
+        key_room = next(name for name, room in rooms.items() if main.CHEST_KEY in room.items)
+        torch_in_cave = main.RIDDLE_ITEM in rooms[main.RIDDLE_ROOM].items
+        expected = key_room not in report["unwinnable"] and (
+            key_room not in report["needs_riddle"] or torch_in_cave)
+        assert (solver.solve(rooms, "Forest Entrance") is not None) == expected, seed
+
+
+def test_riddle_trigger_avoids_names_it_could_be_taken_for(raw_rooms, items):
+    # An exit one letter away from "listen" turns it into a "did you mean"
+    raw = without_passage(raw_rooms)
+    raw[main.RIDDLE_ROOM]["connections"] = raw[main.RIDDLE_ROOM]["connections"] + ["Glisten"]
+    raw["Glisten"] = {"description": "Water drips from shining walls.", "connections": [main.RIDDLE_ROOM]}
+    rooms = {name: main.Room(name, data) for name, data in raw.items()}
+    player = main.Player(start_location=main.RIDDLE_ROOM)
+    assert main.suggest_command(player, rooms, "listen") == ["Glisten"]
+    trigger = solver.riddle_trigger(rooms)
+    assert trigger != "listen"
+
+    riddles = 0
+    for seed in range(200):
+        rooms = shuffled_rooms(raw, seed)
+        solution = solver.solve(rooms, "Forest Entrance")
+        if solution is None or main.RIDDLE_ANSWER not in solution:
+            continue
+        riddles += 1
+        assert trigger in solution
+        seen = replay(rooms, items, solution)
+        assert isinstance(seen[-1], events.GameWon), (seed, solution)
+        assert any(isinstance(e, events.RiddleAsked) for e in seen)
+    assert riddles > 0
@@ -0,0 +1,60 @@
+import events
+import main
+import mapview
+import world
+
+
+class Session:
+    """
+    One player in the shared world, the way world.PlayerConnection sets them up.
+    """
+    def __init__(self, shared):
+        self.shared = shared
+        self.player = main.Player(start_location="Forest Entrance", hp=10)
+        self.visited = set()
+        self.layout = mapview.MapLayout(shared.rooms)
+        self.seen = []
+        self.bus = events.EventBus([self.seen.append, self.layout])
+
+    def play(self, command):
+        main.handle_command(self.bus, self.player, self.shared.rooms, self.shared.items_data, command,
+                            layout=self.layout, world=self.shared)
+        main.show_room(self.bus, self.player, self.shared.rooms, self.visited)
+
+    def last(self, kind):
+        return next(e for e in reversed(self.seen) if isinstance(e, kind))
+
+
+def console_text(event):
+    return main.ConsoleRenderer().format(event)
+
+
+def shared_world(raw_rooms, items):
+    return world.SharedWorld({name: main.Room(name, data) for name, data in raw_rooms.items()}, items)
+
+
+def test_items_are_shared(raw_rooms, items):
+    shared = shared_world(raw_rooms, items)
+    alice, bob = Session(shared), Session(shared)
+    alice.play("pick up map")
+    bob.play("pick up map")
+    assert alice.player.inventory == ["map"]
+    assert bob.player.inventory == []
+    assert bob.last(events.ItemNotHere).item == "map"
+
+
+def test_visits_are_per_player(raw_rooms, items):
+    shared = shared_world(raw_rooms, items)
+    alice, bob = Session(shared), Session(shared)
+    alice.play("cave")
+    bob.play("pick up map")
+    bob.play("map")
+    assert "Cave" not in bob.last(events.MapShown).layout.positions
+
+    bob.play("cave")
+    entered = bob.last(events.RoomEntered)
+    assert entered.first_visit
+    assert console_text(entered).startswith(f"\n{'=' * 40}\n📍  Location: Cave\n📝  ")
+    alice.play("forest entrance")
+    alice.play("cave")
+    assert not alice.last(events.RoomEntered).first_visit
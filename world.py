@@ -0,0 +1,183 @@
+"""
+Shared multiplayer world.
+
+SharedWorld lets many Player objects act on one set of Rooms from different
+threads. It holds no game rules of its own: players act through the normal
+handlers in main.py (handle_command, handle_pickup, handle_move,
+handle_combat, handle_riddle), passing the world, and the handlers take the
+room's lock from it around every change. Each room has its own lock and
+every action holds at most one room lock at a time, so players in different
+rooms never wait for each other and there is no lock ordering to get wrong.
+Each Player must only be driven by one thread at a time (its own connection
+/ task); shared state lives in the rooms and is only touched under that
+room's lock.
+
+Every change to a room also bumps its version number, so front ends can
+tell whether a room view they rendered earlier is stale. Which rooms a
+player has visited is not shared: each connection keeps its own set and
+map layout, so only items and connections are common to everyone.
+
+Play co-op over the network (one thread per connected player):
+
+    python world.py --port 4000
+    nc localhost 4000
+"""
+
+import argparse
+import random
+import socketserver
+import threading
+
+import events
+import main
+import mapview
+
+
+class SharedWorld:
+    def __init__(self, rooms, items_data):
+        self.rooms = rooms
+        self.items_data = items_data
+        self.locks = {name: threading.Lock() for name in rooms}
+        self.versions = {name: 0 for name in rooms}
+        self.enemies = {}      # room name -> Enemy everyone in that room is fighting
+        self._locks_guard = threading.Lock()   # only for creating locks of new rooms
+        for room in rooms.values():
+            room.journal = self
+
+    def lock_for(self, room_name):
+        lock = self.locks.get(room_name)
+        if lock is None:
+            # Rooms added after start-up (hot reload) get their lock on first use
+            with self._locks_guard:
+                lock = self.locks.setdefault(room_name, threading.Lock())
+                self.versions.setdefault(room_name, 0)
+                room = self.rooms.get(room_name)
+                if room is not None:
+                    room.journal = self
+        return lock
+
+    def add(self, room_name):
+        """
+        Called by a Room whenever it changes (the world is every room's journal).
+        """
+        # Changes to items and connections are made under the room's lock
+        self.versions[room_name] = self.versions.get(room_name, 0) + 1
+
+    def version(self, room_name):
+        return self.versions.get(room_name, 0)
+
+    def enemy_in(self, room_name):
+        """
+        The Goblin of this room, shared by everyone fighting there.
+        """
+        with self.lock_for(room_name):
+            enemy = self.enemies.get(room_name)
+            if enemy is None:
+                enemy = main.Enemy(name="Goblin", hp=main.GOBLIN_HP, attack=main.GOBLIN_ATTACK)
+                self.enemies[room_name] = enemy
+        return enemy
+
+    def enemy_defeated(self, room_name, enemy):
+        # Caller holds the room's lock; the next fight here gets a new Goblin
+        if self.enemies.get(room_name) is enemy:
+            del self.enemies[room_name]
+            self.add(room_name)
+
+
+class GlobalLockWorld(SharedWorld):
+    """
+    Same world with one lock for everything; the baseline for the contention benchmark.
+    """
+    def __init__(self, rooms, items_data):
+        super().__init__(rooms, items_data)
+        self.global_lock = threading.Lock()
+
+    def lock_for(self, room_name):
+        return self.global_lock
+
+
+# ----------------------------
+#   Co-op Server
+# ----------------------------
+
+# Per-player state that can't be shared with the rest of the world
+SHARED_WORLD_BLOCKED = ("save", "load", "saves", "undo")
+
+class ConnectionRenderer(main.ConsoleRenderer):
+    """
+    Console rendering for one connected player. A finished game ends that
+    player's connection, not the server.
+    """
+    def __init__(self, output):
+        super().__init__(output)
+        self.over = False
+
+    def __call__(self, event):
+        text = self.format(event)
+        if text is not None:
+            self.output.write(text)
+        if isinstance(event, events.GameEnded):
+            self.over = True
+
+
+class PlayerConnection(socketserver.BaseRequestHandler):
+    def handle(self):
+        world = self.server.world
+        reader = self.request.makefile("r", encoding="utf-8", errors="replace")
+        writer = self.request.makefile("w", encoding="utf-8")
+        output = main.OutputBuffer(writer)
+        renderer = ConnectionRenderer(output)
+        player = main.Player(start_location="Forest Entrance", hp=10)
+        rng = random.Random()
+        # The rooms' visited flags are shared; what this player has seen is theirs alone
+        visited = set()
+        layout = mapview.MapLayout(world.rooms)
+        bus = events.EventBus([renderer, layout])
+
+        def ask(prompt):
+            output.parts.append(prompt)
+            output.flush()
+            line = reader.readline()
+            return line.rstrip("\r\n") if line else None
+
+        try:
+            bus.emit(events.GameStarted())
+            while not renderer.over:
+                main.show_room(bus, player, world.rooms, visited)
+                main.random_event(bus, player, rng)
+                if renderer.over:
+                    break
+                command = ask(main.COMMAND_PROMPT)
+                if command is None:
+                    break
+                if command.strip().lower().split(" ", 1)[0] in SHARED_WORLD_BLOCKED:
+                    output.write("\n⚠️  Saves and undo are not available in the shared world.\n")
+                    continue
+                main.handle_command(bus, player, world.rooms, world.items_data, command,
+                                    ask=ask, layout=layout, rng=rng, world=world)
+            output.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def serve(host, port):
+    main.load_world()
+    main.set_delays(False)     # pauses would only hold up the connection's thread
+    server = socketserver.ThreadingTCPServer((host, port), PlayerConnection)
+    server.daemon_threads = True
+    server.world = SharedWorld(main.rooms, main.items_data)
+    print(f"🌍  Shared world open on {host}:{port}. Players connect with: nc {host} {port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host a shared co-op world.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    args = parser.parse_args()
+    serve(args.host, args.port)